@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 import uuid
@@ -11,15 +11,19 @@ class BlogPost(BaseModel):
     publishDate: str
     readTime: str
     category: str
+    labels: List[str] = []
     url: str
     author: str = "G.J. Rahul"
     featuredImage: Optional[str] = None
+    published: Optional[str] = None
+    updated: Optional[str] = None
 
 class BlogPostsResponse(BaseModel):
     posts: List[BlogPost]
     totalPosts: int
-    lastFetched: str
+    lastFetched: Optional[str] = None
     isFallback: Optional[bool] = False
+    nextCursor: Optional[str] = None
 
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -29,7 +33,95 @@ class ContactMessage(BaseModel):
     submittedAt: datetime = Field(default_factory=datetime.utcnow)
     status: str = "new"
 
+class StoredContactMessage(ContactMessage):
+    model_config = ConfigDict(populate_by_name=True)
+
+    objectId: str = Field(alias="_id")
+    updatedAt: Optional[datetime] = None
+
 class ContactMessageCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     email: str = Field(..., pattern=r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    message: str = Field(..., min_length=1, max_length=1000)
\ No newline at end of file
+    message: str = Field(..., min_length=1, max_length=1000)
+
+class ContactMessageBulkStatusUpdate(BaseModel):
+    newStatus: str
+    ids: Optional[List[str]] = Field(default=None, max_length=1000)
+    status: Optional[str] = None
+    submittedBefore: Optional[datetime] = None
+# Response envelopes, used as response_model for documentation while routes return FastJSONResponse
+class BlogPostsEnvelope(BaseModel):
+    status: str
+    data: BlogPostsResponse
+
+class BlogPostEnvelope(BaseModel):
+    status: str
+    data: BlogPost
+
+class BlogSearchResult(BaseModel):
+    id: str
+    title: str
+    excerpt: str
+    publishDate: str
+    readTime: str
+    category: str
+    labels: List[str] = []
+    url: str
+    author: str
+    featuredImage: Optional[str] = None
+    published: Optional[str] = None
+    updated: Optional[str] = None
+    score: float
+    snippet: str
+
+class BlogSearchResponse(BaseModel):
+    query: str
+    results: List[BlogSearchResult]
+    totalResults: int
+    indexedPosts: int
+
+class BlogSearchEnvelope(BaseModel):
+    status: str
+    data: BlogSearchResponse
+
+class BlogCategory(BaseModel):
+    label: str
+    count: int
+
+class BlogCategoriesResponse(BaseModel):
+    categories: List[BlogCategory]
+    totalPosts: int
+    complete: bool
+
+class BlogCategoriesEnvelope(BaseModel):
+    status: str
+    data: BlogCategoriesResponse
+
+class ContactMessagesPage(BaseModel):
+    messages: List[StoredContactMessage]
+    totalCount: int
+    skip: int
+    limit: int
+    nextCursor: Optional[str] = None
+
+class ContactMessagesEnvelope(BaseModel):
+    status: str
+    data: ContactMessagesPage
+
+class ContactSubmissionData(BaseModel):
+    messageId: str
+    submittedAt: str
+
+class ContactSubmissionEnvelope(BaseModel):
+    status: str
+    message: str
+    data: ContactSubmissionData
+
+class BulkStatusUpdateData(BaseModel):
+    matchedCount: int
+    modifiedCount: int
+
+class StatusUpdateEnvelope(BaseModel):
+    status: str
+    message: str
+    data: Optional[BulkStatusUpdateData] = None
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+class StatusCheck(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class StatusCheckCreate(BaseModel):
+    client_name: str
+
+class StatusCheckBatchItem(BaseModel):
+    client_name: str = Field(..., min_length=1, max_length=200)
+    timestamp: Optional[datetime] = None
+
+class StatusCheckBatch(BaseModel):
+    checks: List[StatusCheckBatchItem] = Field(..., min_length=1, max_length=1000)
+
+class StatusCheckBatchResult(BaseModel):
+    inserted: int
+
+class StatusCheckSummaryBucket(BaseModel):
+    client_name: str
+    bucket: datetime
+    count: int
@@ -0,0 +1,134 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from typing import Optional
+import hmac
+import logging
+import os
+import tracemalloc
+from routes.blog_routes import get_blog_service, response_cache
+from services.blog_service import BlogService
+from services.memory import SnapshotStore, memory_report
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Snapshots live in this worker's memory; each worker answers for itself
+snapshot_store = SnapshotStore(int(os.environ.get('TRACEMALLOC_MAX_SNAPSHOTS', 5)))
+
+STATISTIC_KEYS = '^(lineno|filename|traceback)$'
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Allow the request only with the ADMIN_TOKEN; without one configured the admin API does not exist"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@router.get("/memory", dependencies=[Depends(require_admin)])
+async def get_memory_report(blog_service: BlogService = Depends(get_blog_service)):
+    """
+    Deep byte size of every in-process cache and index, plus this worker's RSS
+
+    Sizes include everything an entry references, so caches holding the same
+    post objects each count them; `totalBytes` counts shared objects once.
+    The walk runs on the event loop and takes longer the more is cached.
+    """
+    report = memory_report({
+        'feedCache': blog_service.feed_cache,
+        'derivedFields': blog_service.derived_cache,
+        'postIndex': blog_service.post_index,
+        'searchIndex': blog_service.search_index,
+        'labelIndex': blog_service.label_index,
+        'encodedResponses': response_cache,
+        'upstreamLatency': blog_service.latency
+    })
+    logger.info(f"Memory report: {report['totalBytes']} bytes in caches, RSS {report['process']['rssBytes']}")
+    return {"status": "success", "data": report}
+
+@router.post("/memory/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = Query(default=10, ge=1, le=100)):
+    """
+    Start tracing allocations in this worker
+
+    - **frames**: Stack frames kept per allocation; more frames cost more memory
+
+    Tracing slows allocation-heavy code noticeably; stop it when done.
+    """
+    started = snapshot_store.start(frames)
+    return {
+        "status": "success",
+        "message": "Allocation tracing started" if started else "Allocation tracing was already running",
+        "data": {"frames": tracemalloc.get_traceback_limit()}
+    }
+
+@router.post("/memory/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    """Stop tracing allocations and drop the snapshots taken so far"""
+    snapshot_store.stop()
+    return {"status": "success", "message": "Allocation tracing stopped"}
+
+@router.get("/memory/snapshots", dependencies=[Depends(require_admin)])
+async def list_snapshots():
+    """Snapshots held for diffing, oldest first"""
+    return {
+        "status": "success",
+        "data": {"tracing": tracemalloc.is_tracing(), "snapshots": snapshot_store.list()}
+    }
+
+@router.post("/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_snapshot(
+    key_type: str = Query(default='lineno', pattern=STATISTIC_KEYS),
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """
+    Take a tracemalloc snapshot and return its largest allocation sites
+
+    - **key_type**: Group allocations by `lineno`, `filename` or `traceback`
+    - **limit**: Number of allocation sites to return
+    """
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="Allocation tracing is not running")
+    taken = await snapshot_store.take()
+    return {
+        "status": "success",
+        "data": {**taken, "top": await snapshot_store.top(taken['id'], key_type, limit)}
+    }
+
+@router.get("/memory/snapshots/{snapshot_id}", dependencies=[Depends(require_admin)])
+async def get_snapshot(
+    snapshot_id: int,
+    key_type: str = Query(default='lineno', pattern=STATISTIC_KEYS),
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """Largest allocation sites of a snapshot taken earlier"""
+    top = await snapshot_store.top(snapshot_id, key_type, limit)
+    if top is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"status": "success", "data": {"id": snapshot_id, "top": top}}
+
+@router.get("/memory/snapshots/{snapshot_id}/diff", dependencies=[Depends(require_admin)])
+async def diff_snapshots(
+    snapshot_id: int,
+    baseline: Optional[int] = None,
+    key_type: str = Query(default='lineno', pattern=STATISTIC_KEYS),
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """
+    Allocation sites that grew or shrank the most between two snapshots
+
+    - **baseline**: Snapshot to compare against (default: the one taken before)
+    - **key_type**: Group allocations by `lineno`, `filename` or `traceback`
+    - **limit**: Number of allocation sites to return
+    """
+    if baseline is None:
+        baseline = snapshot_store.previous_id(snapshot_id)
+        if baseline is None:
+            raise HTTPException(status_code=400, detail="No earlier snapshot to compare against")
+    changes = await snapshot_store.diff(snapshot_id, baseline, key_type, limit)
+    if changes is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {
+        "status": "success",
+        "data": {"id": snapshot_id, "baseline": baseline, "changes": changes}
+    }
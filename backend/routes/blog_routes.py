@@ -1,52 +1,207 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import Any, Awaitable, List, Optional
+import asyncio
 import logging
 from datetime import datetime
 from services.blog_service import BlogService
-from models.blog_models import BlogPost, BlogPostsResponse
+from services.blog_sync import BlogSyncWorker
+from services.cursors import decode_cursor
+from models.blog_models import BlogPost, BlogPostsEnvelope, BlogPostEnvelope, BlogSearchEnvelope, BlogCategoriesEnvelope
+from services.serialization import FastJSONResponse
+from services.response_cache import EncodedResponseCache
+from services.metrics import registry
+from services.circuit_breaker import CLOSED, OPEN, HALF_OPEN
+import os
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/blog", tags=["blog"])
 
-def get_blog_service():
-    return BlogService()
+# One BlogService per process so its feed cache is shared by every request
+_blog_service: Optional[BlogService] = None
 
-@router.get("/posts", response_model=dict)
+def get_blog_service() -> BlogService:
+    global _blog_service
+    if _blog_service is None:
+        _blog_service = BlogService()
+    return _blog_service
+
+# Latency budgets for answering from Blogger; past them the route serves cached or fallback data (0 disables)
+LIST_BUDGET_SECONDS = float(os.environ.get('BLOG_LIST_BUDGET_MS', 300)) / 1000
+POST_BUDGET_SECONDS = float(os.environ.get('BLOG_POST_BUDGET_MS', 500)) / 1000
+
+async def within_budget(awaitable: Awaitable, budget: float) -> Optional[Any]:
+    """
+    Await an upstream call for at most `budget` seconds, returning None once it runs out.
+
+    The call is shielded and keeps running, so its result still lands in the
+    caches for the next request.
+    """
+    task = asyncio.ensure_future(awaitable)
+    if budget <= 0:
+        return await task
+    # Retrieve the outcome of calls nobody waits for any more, so failures are not reported as unhandled
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), budget)
+    except asyncio.TimeoutError:
+        return None
+
+# Serialized, precompressed bodies of blog responses, answered with 304 when the client is current
+response_cache = EncodedResponseCache(int(os.environ.get('BLOG_RESPONSE_CACHE_MAX_ENTRIES', 256)))
+
+def blog_metrics():
+    """Cache effectiveness and upstream health of the blog service, read at scrape time"""
+    blog_service = get_blog_service()
+    caches = {
+        'feed': blog_service.feed_cache.stats(),
+        'derived_fields': blog_service.derived_cache.stats(),
+        'encoded_responses': response_cache.stats()
+    }
+    yield ('blog_cache_hits_total', 'counter', 'Blog cache lookups answered from the cache, by cache',
+           [({'cache': name}, stats['hits'] + stats.get('staleHits', 0)) for name, stats in caches.items()])
+    yield ('blog_cache_misses_total', 'counter', 'Blog cache lookups that missed, by cache',
+           [({'cache': name}, stats['misses']) for name, stats in caches.items()])
+    yield ('blog_cache_hit_ratio', 'gauge', 'Share of blog cache lookups answered from the cache, by cache',
+           [({'cache': name}, stats['hitRatio']) for name, stats in caches.items()])
+    yield ('blog_cache_entries', 'gauge', 'Entries held by each blog cache and index',
+           [({'cache': name}, stats['entries']) for name, stats in caches.items()]
+           + [({'cache': 'post_index'}, len(blog_service.post_index)),
+              ({'cache': 'search_index'}, len(blog_service.search_index))])
+    upstream = blog_service.upstream_stats()
+    breaker = upstream['breaker']
+    yield ('blogger_circuit_state', 'gauge', 'Current state of the Blogger circuit breaker (1 for the active state)',
+           [({'state': state}, 1 if breaker['state'] == state else 0) for state in (CLOSED, OPEN, HALF_OPEN)])
+    yield ('blogger_requests_rejected_total', 'counter', 'Blogger API calls refused by the circuit breaker',
+           [({}, breaker['rejected'])])
+    yield ('blogger_hedged_requests_total', 'counter', 'Duplicate Blogger requests sent because the first was slow',
+           [({}, blog_service.hedges)])
+    yield ('blogger_hedge_wins_total', 'counter', 'Hedged Blogger requests answered by the duplicate first',
+           [({}, blog_service.hedge_wins)])
+
+registry.add_collector(blog_metrics)
+
+def parse_post_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields` projection, rejecting unknown post fields"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in BlogPost.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown post fields: {', '.join(unknown)}")
+    # id is always included so clients can key and link posts
+    return list(dict.fromkeys(['id'] + requested))
+
+def project_posts(result: dict, fields: Optional[List[str]]) -> dict:
+    """Return a copy of a posts page keeping only the requested post fields"""
+    if fields is None:
+        return result
+    data = dict(result['data'])
+    data['posts'] = [{field: post[field] for field in fields if field in post} for post in data['posts']]
+    return {**result, 'data': data}
+
+def posts_fingerprint(result: dict) -> dict:
+    """The part of a posts page that identifies its content, leaving out the fetch time"""
+    return {key: value for key, value in result['data'].items() if key != 'lastFetched'}
+
+def get_blog_mirror(request: Request) -> Optional[BlogSyncWorker]:
+    """Return the MongoDB blog mirror once it has completed a first sync"""
+    blog_sync = getattr(request.app.state, 'blog_sync', None)
+    if blog_sync is not None and blog_sync.ready:
+        return blog_sync
+    return None
+
+@router.get("/posts", response_model=BlogPostsEnvelope)
 async def get_blog_posts(
+    request: Request,
     max_results: int = 10,
-    blog_service: BlogService = Depends(get_blog_service)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    label: Optional[str] = Query(default=None, min_length=1, max_length=200),
+    blog_service: BlogService = Depends(get_blog_service),
+    blog_mirror: Optional[BlogSyncWorker] = Depends(get_blog_mirror)
 ):
     """
     Fetch blog posts from Google Blogger API
     
     - **max_results**: Maximum number of posts to fetch (default: 10)
+    - **cursor**: Opaque `nextCursor` from a previous page to continue from
+    - **fields**: Comma-separated post fields to return, e.g. `title,excerpt,publishDate`;
+      leaving out `content` lists posts without fetching their bodies
+    - **label**: Only posts with this label (see `/blog/categories`); pass it again with the cursor
     """
+    post_fields = parse_post_fields(fields)
+    with_bodies = post_fields is None or 'content' in post_fields
+    position = {}
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            # Mirror cursors hold [publishedAt, post id], live cursors a Blogger page token
+            if 'k' in position:
+                keyset = position['k']
+                if not isinstance(keyset, list) or len(keyset) != 2 or not isinstance(keyset[1], str):
+                    raise ValueError('Invalid keyset position')
+                datetime.fromisoformat(keyset[0])
+            if 'pt' in position and not isinstance(position['pt'], str):
+                raise ValueError('Invalid page token')
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if 'k' in position and blog_mirror is None:
+            raise HTTPException(status_code=400, detail="Cursor is no longer valid")
+
     try:
         logger.info(f"Fetching {max_results} blog posts")
         
-        result = await blog_service.fetch_blog_posts(max_results)
+        cache_key = ('posts', max_results, cursor, fields, label)
+        
+        # Mirror cursors carry a keyset position, live cursors a Blogger page token
+        if blog_mirror is not None and 'pt' not in position:
+            try:
+                version = ('mirror', await blog_mirror.current_version())
+                encoded = response_cache.get(cache_key, version)
+                if encoded is None:
+                    result = await blog_mirror.list_posts(max_results, after=position.get('k'), fields=post_fields, label=label)
+                    encoded = await response_cache.put(cache_key, version, result, fingerprint=posts_fingerprint(result))
+                return response_cache.respond(request, encoded)
+            except Exception as e:
+                logger.error(f"Blog mirror read failed, using live feed: {str(e)}")
+        
+        page = dict(page_token=position.get('pt'), with_bodies=with_bodies, label=label)
+        result = await within_budget(blog_service.fetch_blog_posts(max_results, **page), LIST_BUDGET_SECONDS)
+        if result is None:
+            # Out of time: an old copy of this page beats waiting on Google
+            result = blog_service.peek_blog_posts(max_results, **page)
+            logger.warning(f"Blog list budget of {LIST_BUDGET_SECONDS * 1000:.0f} ms exceeded, serving {'cached' if result else 'fallback'} posts")
+            if result is None or result['status'] != 'success':
+                return FastJSONResponse(project_posts(await blog_service.get_fallback_posts(), post_fields))
         
         if result['status'] == 'error':
             logger.warning(f"Blog API error: {result['message']}")
             # Return fallback posts on error
             fallback_result = await blog_service.get_fallback_posts()
-            return fallback_result
+            return FastJSONResponse(project_posts(fallback_result, post_fields))
         
         logger.info(f"Successfully fetched {result['data']['totalPosts']} blog posts")
-        return result
+        # The feed cache hands out the same result object until it refreshes, so its identity versions the body
+        version = ('live', id(result))
+        encoded = response_cache.get(cache_key, version)
+        if encoded is None:
+            payload = project_posts(result, post_fields)
+            encoded = await response_cache.put(cache_key, version, payload, fingerprint=posts_fingerprint(payload), source=result)
+        return response_cache.respond(request, encoded)
         
     except Exception as e:
         logger.error(f"Unexpected error in get_blog_posts: {str(e)}")
         # Return fallback posts on any unexpected error
-        blog_service = BlogService()
         fallback_result = await blog_service.get_fallback_posts()
-        return fallback_result
+        return FastJSONResponse(project_posts(fallback_result, post_fields))
 
-@router.get("/posts/{post_id}", response_model=dict)
+@router.get("/posts/{post_id}", response_model=BlogPostEnvelope)
 async def get_blog_post_by_id(
+    request: Request,
     post_id: str,
-    blog_service: BlogService = Depends(get_blog_service)
+    blog_service: BlogService = Depends(get_blog_service),
+    blog_mirror: Optional[BlogSyncWorker] = Depends(get_blog_mirror)
 ):
     """
     Get a specific blog post by ID
@@ -56,24 +211,40 @@ async def get_blog_post_by_id(
     try:
         logger.info(f"Fetching blog post with ID: {post_id}")
         
-        # For now, we'll fetch all posts and filter
-        # In a production app, you'd want to implement single post fetching
-        result = await blog_service.fetch_blog_posts(50)  # Fetch more to find the specific post
+        cache_key = ('post', post_id)
+        result = None
+        if blog_mirror is not None:
+            version = ('mirror', await blog_mirror.current_version())
+            encoded = response_cache.get(cache_key, version)
+            if encoded is not None:
+                return response_cache.respond(request, encoded)
+            try:
+                result = await blog_mirror.get_post(post_id)
+            except Exception as e:
+                logger.error(f"Blog mirror read failed, using live lookup: {str(e)}")
+        if result is None:
+            result = await within_budget(blog_service.get_blog_post(post_id), POST_BUDGET_SECONDS)
+            if result is None:
+                result = blog_service.peek_blog_post(post_id)
+                logger.warning(f"Blog post budget of {POST_BUDGET_SECONDS * 1000:.0f} ms exceeded for {post_id}")
+                if result is None:
+                    raise HTTPException(status_code=504, detail="Blog post is taking too long to load, please try again")
+            # The post index hands out the same post object until it expires
+            version = ('live', id(result['data']))
+            encoded = response_cache.get(cache_key, version)
+            if encoded is not None:
+                return response_cache.respond(request, encoded)
         
         if result['status'] == 'error':
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        # Find the specific post
-        posts = result['data']['posts']
-        post = next((p for p in posts if p['id'] == post_id), None)
-        
-        if not post:
-            raise HTTPException(status_code=404, detail="Blog post not found")
+        post = result['data']
         
-        return {
+        encoded = await response_cache.put(cache_key, version, {
             'status': 'success',
             'data': post
-        }
+        }, source=post)
+        return response_cache.respond(request, encoded)
         
     except HTTPException:
         raise
@@ -81,11 +252,72 @@ async def get_blog_post_by_id(
         logger.error(f"Unexpected error in get_blog_post_by_id: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/categories", response_model=BlogCategoriesEnvelope)
+async def get_blog_categories(blog_service: BlogService = Depends(get_blog_service)):
+    """
+    Every post label with its number of posts, most used first
+    
+    Counts come from the label index. `complete` is false until the index has
+    been built from a full walk of the blog, e.g. while the mirror is disabled.
+    """
+    label_index = blog_service.label_index
+    return FastJSONResponse({
+        "status": "success",
+        "data": {
+            "categories": label_index.categories(),
+            "totalPosts": len(label_index),
+            "complete": label_index.complete
+        }
+    })
+
+@router.get("/search", response_model=BlogSearchEnvelope)
+async def search_blog_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=10, ge=1, le=50),
+    prefix: bool = True,
+    blog_service: BlogService = Depends(get_blog_service)
+):
+    """
+    Full-text search over blog posts, ranked with BM25
+    
+    - **q**: Search query
+    - **limit**: Maximum number of results (default: 10)
+    - **prefix**: Also match words that start with a query term (default: true)
+    
+    Answered from the in-memory index, which is filled from the blog mirror
+    and every fetched page; Blogger is never called.
+    """
+    found = blog_service.search_index.search(q, limit=limit, prefix=prefix)
+    return FastJSONResponse({
+        "status": "success",
+        "data": {
+            "query": q,
+            "results": found["results"],
+            "totalResults": found["totalResults"],
+            "indexedPosts": len(blog_service.search_index)
+        }
+    })
+
+@router.get("/cache/stats")
+async def get_blog_cache_stats(blog_service: BlogService = Depends(get_blog_service)):
+    """Hit/miss counters for the blog feed cache and derived post field cache"""
+    return {
+        "status": "success",
+        "data": {
+            "feedCache": blog_service.feed_cache.stats(),
+            "derivedFields": blog_service.derived_cache.stats(),
+            "postIndex": {"entries": len(blog_service.post_index), "maxEntries": blog_service.post_index_max},
+            "encodedResponses": response_cache.stats(),
+            "searchIndex": blog_service.search_index.stats()
+        }
+    }
+
 @router.get("/health")
-async def blog_health_check():
+async def blog_health_check(blog_service: BlogService = Depends(get_blog_service)):
     """Health check endpoint for blog service"""
     return {
         "status": "healthy",
         "service": "blog",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "upstream": blog_service.upstream_stats()
     }
\ No newline at end of file
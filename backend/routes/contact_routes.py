@@ -1,25 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorClient
+from fastapi import APIRouter, HTTPException, Depends, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from bson import ObjectId
+from bson.errors import InvalidId
 import logging
 from datetime import datetime
-import os
-from models.blog_models import ContactMessage, ContactMessageCreate
+from typing import Optional
+from models.blog_models import (
+    ContactMessage, ContactMessageCreate, ContactMessageBulkStatusUpdate,
+    ContactSubmissionEnvelope, ContactMessagesEnvelope, StatusUpdateEnvelope
+)
+from services.serialization import FastJSONResponse
+from services.database import get_database
+from services.cursors import encode_cursor, decode_cursor
+from services.message_counts import MESSAGE_STATUSES, increment_status_count, move_status_count, get_status_counts
+from services.contact_writer import ContactWriteBehind, WriteBehindFull
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-# Database dependency
-async def get_database():
-    mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    return db
+def get_contact_writer(request: Request) -> Optional[ContactWriteBehind]:
+    """Return the write-behind queue when CONTACT_WRITE_BEHIND is enabled"""
+    return getattr(request.app.state, 'contact_writer', None)
 
-@router.post("", response_model=dict)
+@router.post("", response_model=ContactSubmissionEnvelope)
 async def submit_contact_message(
     contact_data: ContactMessageCreate,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    contact_writer: Optional[ContactWriteBehind] = Depends(get_contact_writer)
 ):
     """
     Submit a contact form message
@@ -40,24 +49,44 @@ async def submit_contact_message(
             status="new"
         )
         
+        if contact_writer is not None:
+            # Write-behind: the message is journaled and queued, MongoDB receives it in a batch
+            document = contact_message.dict()
+            document["_id"] = ObjectId()
+            await contact_writer.submit(document)
+            
+            return FastJSONResponse({
+                "status": "success",
+                "message": "Thank you for your message! I'll get back to you soon.",
+                "data": {
+                    "messageId": str(document["_id"]),
+                    "submittedAt": contact_message.submittedAt.isoformat()
+                }
+            })
+        
         # Save to database
         result = await db.contact_messages.insert_one(contact_message.dict())
         
         if result.inserted_id:
             logger.info(f"Contact message saved with ID: {result.inserted_id}")
+            await increment_status_count(db, contact_message.status)
             
-            return {
+            return FastJSONResponse({
                 "status": "success",
                 "message": "Thank you for your message! I'll get back to you soon.",
                 "data": {
                     "messageId": str(result.inserted_id),
                     "submittedAt": contact_message.submittedAt.isoformat()
                 }
-            }
+            })
         else:
             logger.error("Failed to save contact message to database")
             raise HTTPException(status_code=500, detail="Failed to save message")
             
+    except WriteBehindFull as e:
+        logger.warning(f"Rejecting contact message under load: {str(e)}")
+        raise HTTPException(status_code=503, detail="We're receiving a lot of messages right now, please try again shortly")
+        
     except ValueError as e:
         logger.warning(f"Validation error in contact form: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -66,52 +95,141 @@ async def submit_contact_message(
         logger.error(f"Unexpected error in submit_contact_message: {str(e)}")
         raise HTTPException(status_code=500, detail="An error occurred while processing your message")
 
-@router.get("/messages", response_model=dict)
+@router.get("/messages", response_model=ContactMessagesEnvelope)
 async def get_contact_messages(
     skip: int = 0,
     limit: int = 50,
     status: str = None,
+    cursor: Optional[str] = None,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Get contact messages (admin endpoint)
     
-    - **skip**: Number of messages to skip for pagination
+    - **skip**: Number of messages to skip for pagination (ignored when a cursor is given)
     - **limit**: Maximum number of messages to return
     - **status**: Filter by message status (new, read, responded)
+    - **cursor**: Opaque `nextCursor` from a previous page to continue from
     """
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            after_submitted = datetime.fromisoformat(position['s'])
+            after_id = ObjectId(position['i'])
+        except (ValueError, KeyError, TypeError, InvalidId):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
         # Build query filter
         query_filter = {}
         if status:
             query_filter["status"] = status
         
-        # Fetch messages
-        cursor = db.contact_messages.find(query_filter).sort("submittedAt", -1).skip(skip).limit(limit)
-        messages = await cursor.to_list(length=limit)
+        # Keyset pagination: continue strictly after the (submittedAt, _id) of the last page
+        if position is not None:
+            query_filter["$or"] = [
+                {"submittedAt": {"$lt": after_submitted}},
+                {"submittedAt": after_submitted, "_id": {"$lt": after_id}}
+            ]
+        
+        # Fetch one extra message to know whether another page exists
+        cursor_query = db.contact_messages.find(query_filter).sort([("submittedAt", -1), ("_id", -1)])
+        if position is None and skip:
+            cursor_query = cursor_query.skip(skip)
+        messages = await cursor_query.limit(limit + 1).to_list(length=limit + 1)
         
-        # Get total count
-        total_count = await db.contact_messages.count_documents(query_filter)
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            last = messages[-1]
+            next_cursor = encode_cursor({"s": last["submittedAt"].isoformat(), "i": str(last["_id"])})
         
-        # Convert ObjectId to string for JSON serialization
-        for message in messages:
-            message["_id"] = str(message["_id"])
+        # Totals are maintained per status instead of counting the collection on every call
+        counts = await get_status_counts(db)
+        total_count = counts.get(status, 0) if status else sum(counts.values())
         
-        return {
+        return FastJSONResponse({
             "status": "success",
             "data": {
                 "messages": messages,
                 "totalCount": total_count,
                 "skip": skip,
-                "limit": limit
+                "limit": limit,
+                "nextCursor": next_cursor
             }
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error fetching contact messages: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch messages")
 
-@router.put("/messages/{message_id}/status", response_model=dict)
+@router.put("/messages/status", response_model=StatusUpdateEnvelope)
+async def bulk_update_message_status(
+    update: ContactMessageBulkStatusUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Update the status of many contact messages in one request
+    
+    - **newStatus**: New status (new, read, responded)
+    - **ids**: IDs of the messages to update
+    - **status**: Only update messages currently in this status
+    - **submittedBefore**: Only update messages submitted before this time
+    
+    At least one of ids, status or submittedBefore is required.
+    """
+    if update.newStatus not in MESSAGE_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status value")
+    if update.status is not None and update.status not in MESSAGE_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status filter")
+    
+    query_filter = {}
+    if update.ids is not None:
+        try:
+            query_filter["_id"] = {"$in": [ObjectId(message_id) for message_id in update.ids]}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid message ID")
+    if update.status is not None:
+        query_filter["status"] = update.status
+    if update.submittedBefore is not None:
+        query_filter["submittedAt"] = {"$lt": update.submittedBefore}
+    if not query_filter:
+        raise HTTPException(status_code=400, detail="Provide ids or a filter to select messages")
+    
+    try:
+        # Only messages that actually change status affect the per-status totals
+        changing = {"$and": [query_filter, {"status": {"$ne": update.newStatus}}]}
+        moved = [
+            group async for group in db.contact_messages.aggregate([
+                {"$match": changing},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ])
+        ]
+        
+        result = await db.contact_messages.update_many(
+            query_filter,
+            {"$set": {"status": update.newStatus, "updatedAt": datetime.utcnow()}}
+        )
+        
+        for group in moved:
+            await move_status_count(db, group["_id"], update.newStatus, group["count"])
+        
+        logger.info(f"Bulk status update to {update.newStatus}: matched {result.matched_count}, modified {result.modified_count}")
+        return FastJSONResponse({
+            "status": "success",
+            "message": f"Message status updated to {update.newStatus}",
+            "data": {
+                "matchedCount": result.matched_count,
+                "modifiedCount": result.modified_count
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Error bulk updating message status: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update message status")
+
+@router.put("/messages/{message_id}/status", response_model=StatusUpdateEnvelope)
 async def update_message_status(
     message_id: str,
     new_status: str,
@@ -124,24 +242,31 @@ async def update_message_status(
     - **new_status**: New status (new, read, responded)
     """
     try:
-        if new_status not in ["new", "read", "responded"]:
+        if new_status not in MESSAGE_STATUSES:
             raise HTTPException(status_code=400, detail="Invalid status value")
         
-        from bson import ObjectId
+        try:
+            object_id = ObjectId(message_id)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid message ID")
         
-        # Update message status
-        result = await db.contact_messages.update_one(
-            {"_id": ObjectId(message_id)},
-            {"$set": {"status": new_status, "updatedAt": datetime.utcnow()}}
+        # Update message status, reading back the previous status to keep the totals right
+        previous = await db.contact_messages.find_one_and_update(
+            {"_id": object_id},
+            {"$set": {"status": new_status, "updatedAt": datetime.utcnow()}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Message not found")
         
-        return {
+        await move_status_count(db, previous.get("status", "new"), new_status)
+        
+        return FastJSONResponse({
             "status": "success",
             "message": f"Message status updated to {new_status}"
-        }
+        })
         
     except HTTPException:
         raise
@@ -0,0 +1,201 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from bson.errors import InvalidId
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from models.status_models import (
+    StatusCheck, StatusCheckCreate, StatusCheckBatch, StatusCheckBatchResult, StatusCheckSummaryBucket
+)
+from services.database import get_database
+from services.cursors import encode_cursor, decode_cursor
+from services.serialization import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/status", tags=["status"])
+
+# Documents per Motor batch, and per chunk written to a streaming response
+STATUS_STREAM_BATCH = int(os.environ.get('STATUS_STREAM_BATCH', 500))
+
+# Default and maximum page size of the JSON list; streaming formats are not built in memory and stay unbounded
+STATUS_LIST_LIMIT = 1000
+
+# Default and maximum window per summary bucket size, which bound the number of buckets returned
+SUMMARY_WINDOWS = {
+    'minute': (timedelta(hours=1), timedelta(days=1)),
+    'hour': (timedelta(days=1), timedelta(days=31))
+}
+
+def utc_naive(value: datetime) -> datetime:
+    """Normalise a datetime to naive UTC, as stored by MongoDB"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def status_check_json(document: dict) -> str:
+    return json.dumps({
+        "id": document.get("id"),
+        "client_name": document.get("client_name"),
+        "timestamp": document["timestamp"].isoformat()
+    })
+
+async def stream_status_checks(cursor, array: bool):
+    """Encode a Motor cursor batch by batch so memory stays flat however large the range"""
+    if array:
+        yield b"["
+    first = True
+    chunk = []
+    async for document in cursor:
+        line = status_check_json(document)
+        if array:
+            chunk.append(line if first else "," + line)
+        else:
+            chunk.append(line + "\n")
+        first = False
+        if len(chunk) >= STATUS_STREAM_BATCH:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+    if array:
+        yield b"]"
+
+@router.post("", response_model=StatusCheck)
+async def create_status_check(input: StatusCheckCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+    status_dict = input.dict()
+    status_obj = StatusCheck(**status_dict)
+    _ = await db.status_checks.insert_one(status_obj.dict())
+    return status_obj
+
+@router.post("/batch", response_model=StatusCheckBatchResult)
+async def create_status_checks_batch(batch: StatusCheckBatch, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """
+    Record up to 1000 status checks in one unordered insert
+
+    - **checks**: Each with a client_name and an optional timestamp (defaults to now)
+    """
+    now = datetime.utcnow()
+    documents = [
+        {
+            "id": str(uuid.uuid4()),
+            "client_name": check.client_name,
+            "timestamp": utc_naive(check.timestamp) if check.timestamp else now
+        }
+        for check in batch.checks
+    ]
+    try:
+        result = await db.status_checks.insert_many(documents, ordered=False)
+    except Exception as e:
+        logger.error(f"Error inserting status check batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to record status checks")
+    return StatusCheckBatchResult(inserted=len(result.inserted_ids))
+
+@router.get("", response_model=List[StatusCheck])
+async def get_status_checks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    format: Optional[str] = Query(default=None, pattern="^(ndjson|json-stream)$"),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    List status checks, oldest first
+
+    - **since** / **until**: Only checks with a timestamp in [since, until)
+    - **cursor**: The `X-Next-Cursor` header of a previous page, to continue after it
+    - **limit**: Maximum number of checks (default and maximum 1000 for the JSON list, unlimited when streaming)
+    - **format**: `ndjson` or `json-stream` streams the matching checks instead of building a list
+    """
+    if format is None and limit is not None and limit > STATUS_LIST_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be at most {STATUS_LIST_LIMIT}; use format=ndjson to stream more")
+    conditions = []
+    if since is not None:
+        conditions.append({"timestamp": {"$gte": since}})
+    if until is not None:
+        conditions.append({"timestamp": {"$lt": until}})
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            after_timestamp = datetime.fromisoformat(position["t"])
+            after_id = ObjectId(position["i"])
+        except (ValueError, KeyError, TypeError, InvalidId):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        conditions.append({"$or": [
+            {"timestamp": {"$gt": after_timestamp}},
+            {"timestamp": after_timestamp, "_id": {"$gt": after_id}}
+        ]})
+    query_filter = {"$and": conditions} if conditions else {}
+
+    query = db.status_checks.find(query_filter, {"id": 1, "client_name": 1, "timestamp": 1})
+    query = query.sort([("timestamp", 1), ("_id", 1)]).batch_size(STATUS_STREAM_BATCH)
+
+    if format is not None:
+        if limit is not None:
+            query = query.limit(limit)
+        media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+        return StreamingResponse(stream_status_checks(query, array=format == "json-stream"), media_type=media_type)
+
+    limit = limit or STATUS_LIST_LIMIT
+    status_checks = await query.limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        last = status_checks[-1]
+        headers["X-Next-Cursor"] = encode_cursor({"t": last["timestamp"].isoformat(), "i": str(last["_id"])})
+    for status_check in status_checks:
+        del status_check["_id"]
+    return FastJSONResponse(status_checks, headers=headers)
+
+@router.get("/summary", response_model=List[StatusCheckSummaryBucket])
+async def get_status_summary(
+    unit: str = Query(default="hour", pattern="^(minute|hour)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Count status checks per client per minute or hour
+
+    - **unit**: `minute` (up to one day at a time) or `hour` (up to 31 days)
+    - **since** / **until**: Window to summarise, defaulting to the last hour or day
+    - **client_name**: Only count checks from this client
+    """
+    default_window, max_window = SUMMARY_WINDOWS[unit]
+    until = utc_naive(until) if until else datetime.utcnow()
+    since = utc_naive(since) if since else until - default_window
+    if since >= until or until - since > max_window:
+        raise HTTPException(status_code=400, detail=f"Window must be positive and at most {max_window.days or 1} day(s) for unit '{unit}'")
+
+    match = {"timestamp": {"$gte": since, "$lt": until}}
+    if client_name:
+        match["client_name"] = client_name
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "client_name": "$client_name",
+                "bucket": {"$dateTrunc": {"date": "$timestamp", "unit": unit}}
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"_id.bucket": 1, "_id.client_name": 1}}
+    ]
+    try:
+        buckets = await db.status_checks.aggregate(pipeline).to_list(length=None)
+    except Exception as e:
+        logger.error(f"Error summarising status checks: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to summarise status checks")
+
+    return FastJSONResponse([
+        {"client_name": bucket["_id"]["client_name"], "bucket": bucket["_id"]["bucket"], "count": bucket["count"]}
+        for bucket in buckets
+    ])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Load test for contact message writes against a local mongod.
+
+Compares one awaited insert_one per submission (the default request path)
+with the write-behind queue, using the same concurrency for both. Run from the
+backend directory:
+
+    python scripts/bench_contact_writes.py --messages 5000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.database import create_motor_client  # noqa: E402
+from services.contact_writer import ContactWriteBehind  # noqa: E402
+
+BENCH_DB = 'contact_write_bench'
+
+
+def make_document(i: int) -> dict:
+    return {
+        'name': f'Load Test {i}',
+        'email': f'load{i}@example.com',
+        'message': 'Benchmark message ' * 10,
+        'submittedAt': datetime.utcnow(),
+        'status': 'new'
+    }
+
+
+async def run_concurrently(total: int, concurrency: int, submit) -> float:
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            await submit(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return time.perf_counter() - start
+
+
+async def bench_insert_one(db, total: int, concurrency: int) -> float:
+    async def submit(i):
+        await db.contact_messages.insert_one(make_document(i))
+    return await run_concurrently(total, concurrency, submit)
+
+
+async def bench_write_behind(db, total: int, concurrency: int):
+    with tempfile.TemporaryDirectory() as journal_dir:
+        writer = ContactWriteBehind(db, journal_dir=journal_dir)
+        await writer.start()
+
+        async def submit(i):
+            document = make_document(i)
+            document['_id'] = ObjectId()
+            await writer.submit(document)
+
+        accepted = await run_concurrently(total, concurrency, submit)
+        drain_start = time.perf_counter()
+        await writer.stop()
+        return accepted, accepted + time.perf_counter() - drain_start, writer.stats()
+
+
+async def main(args):
+    client = create_motor_client(args.mongo_url)
+    db = client[BENCH_DB]
+    try:
+        await client.drop_database(BENCH_DB)
+        elapsed = await bench_insert_one(db, args.messages, args.concurrency)
+        print(f"insert_one per request: {args.messages / elapsed:10.0f} msg/s ({elapsed:.2f}s)")
+
+        await client.drop_database(BENCH_DB)
+        accepted, stored, stats = await bench_write_behind(db, args.messages, args.concurrency)
+        stored_count = await db.contact_messages.count_documents({})
+        print(f"write-behind accepted:  {args.messages / accepted:10.0f} msg/s ({accepted:.2f}s)")
+        print(f"write-behind stored:    {args.messages / stored:10.0f} msg/s ({stored:.2f}s, {stats['batches']} batches)")
+        print(f"documents stored: {stored_count}/{args.messages}")
+    finally:
+        await client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the blog list and contact list payloads.
+
+Compares the paths a route response can take through FastAPI:
+
+- response_model=dict: validate and serialize through the response field, then json
+- jsonable_encoder: no response model, FastAPI's encoder then json
+- typed model: validate against the typed envelope, then json
+- FastJSONResponse: the payload rendered directly by orjson, as the routes now do
+
+Run from the backend directory:
+
+    python scripts/bench_serialization.py --posts 10 --messages 50 --repeat 200
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.blog_models import BlogPostsEnvelope, ContactMessagesEnvelope  # noqa: E402
+from services.serialization import FastJSONResponse  # noqa: E402
+
+PARAGRAPH = (
+    '<p>Gradient descent updates the <strong>weights</strong> in the direction that reduces the loss, '
+    'scaled by a learning rate &amp; momentum term. <a href="https://example.com">Read more</a></p>\n'
+)
+
+
+def blog_payload(posts: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        'status': 'success',
+        'data': {
+            'posts': [
+                {
+                    'id': str(1000 + i),
+                    'title': f'Post {i}: notes on training neural networks',
+                    'excerpt': 'Gradient descent updates the weights in the direction that reduces the loss...',
+                    'content': PARAGRAPH * 120,
+                    'publishDate': (now - timedelta(days=i)).strftime('%B %d, %Y'),
+                    'readTime': '6 min read',
+                    'category': 'AI/ML',
+                    'url': f'https://example.blogspot.com/2024/01/post-{i}.html',
+                    'author': 'G.J. Rahul',
+                    'featuredImage': f'https://example.com/images/{i}.png',
+                    'published': (now - timedelta(days=i)).isoformat() + 'Z',
+                    'updated': (now - timedelta(days=i)).isoformat() + 'Z'
+                }
+                for i in range(posts)
+            ],
+            'totalPosts': posts,
+            'lastFetched': now.isoformat(),
+            'nextCursor': None
+        }
+    }
+
+
+def contact_payload(messages: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        'status': 'success',
+        'data': {
+            'messages': [
+                {
+                    '_id': str(ObjectId()),
+                    'id': f'00000000-0000-0000-0000-{i:012d}',
+                    'name': f'Visitor {i}',
+                    'email': f'visitor{i}@example.com',
+                    'message': 'I enjoyed your post on transformers and had a question about attention. ' * 4,
+                    'submittedAt': now - timedelta(minutes=i),
+                    'status': 'new'
+                }
+                for i in range(messages)
+            ],
+            'totalCount': messages,
+            'skip': 0,
+            'limit': messages,
+            'nextCursor': None
+        }
+    }
+
+
+def time_per_call(render, repeat: int) -> float:
+    render()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_payload(name: str, payload: dict, envelope, repeat: int) -> None:
+    dict_field = create_response_field(name='response', type_=dict)
+    typed_field = create_response_field(name='response', type_=envelope)
+
+    loop = asyncio.new_event_loop()
+
+    def via_response_model(field):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=payload))
+        return JSONResponse(content).body
+
+    paths = {
+        'response_model=dict': lambda: via_response_model(dict_field),
+        'jsonable_encoder': lambda: JSONResponse(jsonable_encoder(payload)).body,
+        'typed model': lambda: via_response_model(typed_field),
+        'FastJSONResponse': lambda: FastJSONResponse(payload).body
+    }
+
+    size = len(FastJSONResponse(payload).body)
+    print(f"\n{name} ({size / 1024:.0f} KiB)")
+    baseline = None
+    for label, render in paths.items():
+        elapsed = time_per_call(render, repeat)
+        baseline = baseline or elapsed
+        print(f"  {label:<22} {elapsed:8.3f} ms   {baseline / elapsed:5.1f}x")
+    loop.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare JSON serialization paths for API payloads')
+    parser.add_argument('--posts', type=int, default=10)
+    parser.add_argument('--messages', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    bench_payload(f'Blog list, {args.posts} posts', blog_payload(args.posts), BlogPostsEnvelope, args.repeat)
+    bench_payload(f'Contact list, {args.messages} messages', contact_payload(args.messages), ContactMessagesEnvelope, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
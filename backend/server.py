@@ -1,60 +1,59 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
-import uuid
-from datetime import datetime
 
 # Import the new route modules
-from routes.blog_routes import router as blog_router
+from routes.blog_routes import router as blog_router, get_blog_service
 from routes.contact_routes import router as contact_router
+from routes.status_routes import router as status_router
+from routes.admin_routes import router as admin_router
+from services.blog_sync import BlogSyncWorker
+from services.database import create_motor_client, pool_stats
+from services.db_indexes import reconcile_indexes
+from services.status_storage import ensure_status_collection, status_check_indexes
+from services.message_counts import rebuild_status_counts
+from services.contact_writer import ContactWriteBehind
+from services.serialization import FastJSONResponse
+from services.profiling import ProfilingMiddleware, RequestProfiler
+from services.metrics import MetricsMiddleware, registry as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, shared by every router through the get_database dependency
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = create_motor_client(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Create the main app without a prefix
-app = FastAPI()
+# Create the main app without a prefix; every JSON response is rendered with orjson
+app = FastAPI(default_response_class=FastJSONResponse)
+app.state.mongo_client = client
+app.state.db = db
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 
-# Define Models
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-
-class StatusCheckCreate(BaseModel):
-    client_name: str
-
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
-@api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+@api_router.get("/db/pool")
+async def get_db_pool_stats():
+    """Connection pool counters for the shared MongoDB client"""
+    return {"status": "success", "data": pool_stats.snapshot()}
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, dependency and cache metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -62,6 +61,8 @@ app.include_router(api_router)
 # Include the new routers
 app.include_router(blog_router, prefix="/api")
 app.include_router(contact_router, prefix="/api")
+app.include_router(status_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +72,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; when disabled the middleware is not installed at all
+if os.environ.get('PROFILE_ENABLED', 'false').lower() == 'true':
+    app.state.profiler = RequestProfiler.from_env()
+    app.add_middleware(ProfilingMiddleware, profiler=app.state.profiler)
+
+# Added last so it is outermost and its latencies include CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -78,6 +87,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def ensure_indexes():
+    try:
+        timeseries = await ensure_status_collection(db)
+        await reconcile_indexes(db, {'status_checks': status_check_indexes(timeseries)})
+        # Recount once per boot so the maintained per-status totals cannot drift for long
+        await rebuild_status_counts(db)
+    except Exception as e:
+        logger.error(f"Index reconciliation failed: {str(e)}")
+
+@app.on_event("startup")
+async def startup_indexes():
+    # Reconcile in the background so an unreachable MongoDB does not hold up startup
+    app.state.index_task = asyncio.create_task(ensure_indexes())
+
+@app.on_event("startup")
+async def startup_contact_writer():
+    # Opt-in: batch contact submissions into MongoDB instead of one insert per request
+    if os.environ.get('CONTACT_WRITE_BEHIND', 'false').lower() == 'true':
+        app.state.contact_writer = ContactWriteBehind(db)
+        await app.state.contact_writer.start()
+
+@app.on_event("shutdown")
+async def shutdown_contact_writer():
+    contact_writer = getattr(app.state, 'contact_writer', None)
+    if contact_writer is not None:
+        await contact_writer.stop()
+
+@app.on_event("startup")
+async def startup_blog_service():
+    # Open the pooled Blogger HTTP client once for the app lifespan
+    await get_blog_service().start()
+
+@app.on_event("startup")
+async def startup_blog_sync():
+    # Mirror the blog into MongoDB so blog routes never wait on Google
+    if os.environ.get('BLOG_SYNC_ENABLED', 'true').lower() == 'true':
+        app.state.blog_sync = BlogSyncWorker(db, get_blog_service())
+        await app.state.blog_sync.start()
+
+@app.on_event("shutdown")
+async def shutdown_blog_sync():
+    blog_sync = getattr(app.state, 'blog_sync', None)
+    if blog_sync is not None:
+        await blog_sync.stop()
+
+@app.on_event("shutdown")
+async def shutdown_blog_service():
+    await get_blog_service().close()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
@@ -1,59 +1,99 @@
-import requests
-import re
+import asyncio
+import httpx
+import multiprocessing
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import logging
-from html import unescape
-import math
+from urllib.parse import quote
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from services.cache import FeedCache, DerivedFieldCache
+from services.search_index import SearchIndex
+from services.label_index import LabelIndex
+from services.circuit_breaker import CircuitBreaker, CLOSED
+from services.latency import LatencyTracker
+from services.metrics import blogger_request_duration
+from services.http_client import create_http_client
+from services.cursors import encode_cursor
+from services.html_processor import process_html, format_read_time, derive_post_fields, derive_post_fields_batch
 
 logger = logging.getLogger(__name__)
 
+# Blogger fields needed to build a processed post
+POST_FIELDS = 'id,title,content,published,updated,url,author,labels'
+
+# The same fields for listings requested with fetchBodies=false
+POST_SUMMARY_FIELDS = 'id,title,published,updated,url,author,labels'
+
+class BlogFetchError(Exception):
+    """Raised when streaming posts from Blogger fails part way through"""
+
 class BlogService:
     def __init__(self):
         self.api_key = os.environ.get('GOOGLE_API_KEY')
         self.blog_id = os.environ.get('BLOGGER_BLOG_ID')
         self.base_url = "https://www.googleapis.com/blogger/v3/blogs"
-        self.cache_duration = timedelta(hours=1)
+        self.cache_duration = timedelta(seconds=int(os.environ.get('BLOG_CACHE_TTL_SECONDS', 3600)))
+        self.feed_cache = FeedCache(
+            ttl=self.cache_duration.total_seconds(),
+            stale_ttl=int(os.environ.get('BLOG_CACHE_STALE_SECONDS', 86400)),
+            max_entries=int(os.environ.get('BLOG_CACHE_MAX_ENTRIES', 32)),
+            policy=os.environ.get('BLOG_CACHE_POLICY', 'lru')
+        )
+        self.derived_cache = DerivedFieldCache(
+            max_entries=int(os.environ.get('BLOG_DERIVED_CACHE_MAX_ENTRIES', 2048)),
+            path=os.environ.get('BLOG_DERIVED_CACHE_PATH') or None
+        )
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+        # Stops sending requests to a failing Blogger so callers get cached or fallback data at once
+        self.breaker = CircuitBreaker(
+            'blogger',
+            failure_threshold=int(os.environ.get('BLOGGER_BREAKER_FAILURES', 5)),
+            reset_timeout=float(os.environ.get('BLOGGER_BREAKER_RESET_SECONDS', 30)),
+            half_open_probes=int(os.environ.get('BLOGGER_BREAKER_PROBES', 1))
+        )
+
+        # A request still unanswered after the observed percentile latency gets a duplicate; the first reply wins
+        self.latency = LatencyTracker(window=int(os.environ.get('BLOGGER_LATENCY_WINDOW', 256)))
+        self.hedge_enabled = os.environ.get('BLOGGER_HEDGE_ENABLED', 'true').lower() == 'true'
+        self.hedge_percentile = float(os.environ.get('BLOGGER_HEDGE_PERCENTILE', 95))
+        self.hedge_min_delay = float(os.environ.get('BLOGGER_HEDGE_MIN_DELAY_MS', 50)) / 1000
+        self.hedge_default_delay = float(os.environ.get('BLOGGER_HEDGE_DEFAULT_DELAY_MS', 250)) / 1000
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        # Opt-in: large refreshes fan HTML processing out to worker processes; 0 workers disables the pool
+        self.process_pool_workers = int(os.environ.get('BLOG_PROCESS_POOL_WORKERS', 0))
+        self.process_pool_min_batch = int(os.environ.get('BLOG_PROCESS_POOL_MIN_BATCH', 32))
+        self.process_pool_chunk_size = int(os.environ.get('BLOG_PROCESS_POOL_CHUNK_SIZE', 16))
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # id -> (processed post, indexed at), kept in sync with every feed fetch
+        self.post_index: "OrderedDict[str, tuple]" = OrderedDict()
+        self.post_index_max = int(os.environ.get('BLOG_POST_INDEX_MAX', 1000))
+
+        # Full-text index over every post seen with its body, updated as pages are fetched
+        self.search_index = SearchIndex()
+        self.label_index = LabelIndex()
         
     def calculate_read_time(self, content: str) -> str:
         """Calculate estimated read time based on content length"""
-        # Remove HTML tags and count words
-        clean_content = re.sub(r'<[^>]+>', '', content)
-        word_count = len(clean_content.split())
-        
-        # Average reading speed: 200 words per minute
-        read_time_minutes = math.ceil(word_count / 200)
-        
-        if read_time_minutes <= 1:
-            return "1 min read"
-        else:
-            return f"{read_time_minutes} min read"
+        return format_read_time(process_html(content).word_count)
     
     def clean_html_content(self, html_content: str) -> str:
         """Clean HTML content and create excerpt"""
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', '', html_content)
-        # Unescape HTML entities
-        clean_text = unescape(clean_text)
-        # Remove extra whitespace
-        clean_text = ' '.join(clean_text.split())
-        
-        # Create excerpt (first 150 characters)
-        if len(clean_text) > 150:
-            excerpt = clean_text[:150] + "..."
-        else:
-            excerpt = clean_text
-            
-        return excerpt
+        return process_html(html_content).excerpt
     
-    def process_blog_post(self, post_data: Dict) -> Dict:
+    def process_blog_post(self, post_data: Dict, with_body: bool = True) -> Dict:
         """Process raw blog post data from Google API"""
         try:
-            # Extract basic information
+            # Extract basic information; posts listed without bodies carry no content
             post_id = post_data.get('id', '')
             title = post_data.get('title', 'Untitled')
-            content = post_data.get('content', '')
+            content = post_data.get('content', '') if with_body else None
             url = post_data.get('url', '')
             
             # Process publish date
@@ -64,13 +104,23 @@ class BlogService:
             except:
                 publish_date = 'Date unavailable'
             
-            # Generate excerpt
-            excerpt = self.clean_html_content(content)
-            
-            # Calculate read time
-            read_time = self.calculate_read_time(content)
+            # Derived fields only change when the content does, reuse them when we can
+            revision_key = self.derived_cache.key_for_post(post_id, post_data.get('updated', ''))
+            if content is None:
+                derived = self.derived_cache.get(revision_key)
+                if derived is None:
+                    logger.error(f"No derived fields cached for body-less post {post_id}")
+                    return None
+            else:
+                derived_key = self.derived_cache.key_for(content, post_data.get('updated', ''))
+                derived = self.derived_cache.get(derived_key)
+                if derived is None:
+                    derived = derive_post_fields(content)
+                    self.derived_cache.put(derived_key, derived)
+                # Also remember them by revision so body-less listings can reuse them
+                self.derived_cache.put(revision_key, derived)
             
-            # Extract category from labels
+            # Category is the first label; all labels are kept for topic filtering
             labels = post_data.get('labels', [])
             category = labels[0] if labels else 'AI/ML'
             
@@ -78,31 +128,187 @@ class BlogService:
             author_info = post_data.get('author', {})
             author = author_info.get('displayName', 'G.J. Rahul')
             
-            # Look for featured image in content
-            featured_image = None
-            img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', content)
-            if img_match:
-                featured_image = img_match.group(1)
-            
-            return {
+            post = {
                 'id': post_id,
                 'title': title,
-                'excerpt': excerpt,
+                'excerpt': derived['excerpt'],
                 'content': content,
                 'publishDate': publish_date,
-                'readTime': read_time,
+                'readTime': derived['readTime'],
                 'category': category,
+                'labels': labels,
                 'url': url,
                 'author': author,
-                'featuredImage': featured_image
+                'featuredImage': derived['featuredImage'],
+                'published': published_str,
+                'updated': post_data.get('updated', published_str)
             }
+            if content is None:
+                del post['content']
+            return post
             
         except Exception as e:
             logger.error(f"Error processing blog post: {str(e)}")
             return None
     
-    async def fetch_blog_posts(self, max_results: int = 10) -> Dict:
-        """Fetch blog posts from Google Blogger API"""
+    async def process_blog_posts(self, posts_data: List[Dict], with_bodies: bool = True) -> List[Dict]:
+        """Process a batch of raw posts, offloading HTML work to the process pool for large batches"""
+        if not with_bodies:
+            # Nothing to parse, every derived field comes from the cache
+            return [post for post in (self.process_blog_post(post_data, with_body=False) for post_data in posts_data) if post]
+
+        keys = [
+            self.derived_cache.key_for(post_data.get('content', ''), post_data.get('updated', ''))
+            for post_data in posts_data
+        ]
+        misses = [i for i, key in enumerate(keys) if key not in self.derived_cache]
+
+        if self.process_pool_workers > 0 and len(misses) >= self.process_pool_min_batch:
+            # Chunk the uncached posts so each task amortises its pickling round trip
+            contents = [posts_data[i].get('content', '') for i in misses]
+            chunk_size = max(1, self.process_pool_chunk_size)
+            chunks = [contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size)]
+            loop = asyncio.get_running_loop()
+            pool = self._get_process_pool()
+            try:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, derive_post_fields_batch, chunk) for chunk in chunks
+                ])
+                derived = [fields for chunk_result in results for fields in chunk_result]
+                for i, fields in zip(misses, derived):
+                    self.derived_cache.put(keys[i], fields)
+            except Exception as e:
+                # A broken pool only costs speed, the posts are processed inline below
+                logger.error(f"Process pool batch failed, processing inline: {str(e)}")
+
+        # Cache hits make this loop cheap; anything the pool did not cover is processed here
+        posts = []
+        for post_data in posts_data:
+            processed_post = self.process_blog_post(post_data)
+            if processed_post:
+                posts.append(processed_post)
+        return posts
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Never fork: by now the process runs pymongo monitor and executor threads that a child could deadlock on
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_pool_workers,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return self._process_pool
+
+    async def fetch_blog_posts(
+        self,
+        max_results: int = 10,
+        page_token: Optional[str] = None,
+        with_bodies: bool = True,
+        label: Optional[str] = None
+    ) -> Dict:
+        """
+        Fetch a page of blog posts, served from the shared feed cache when possible.
+
+        Without bodies the page is listed with fetchBodies=false and posts carry
+        no `content`; their excerpt, read time and image come from the derived
+        field cache. A label restricts the page to posts with that label,
+        filtered by Blogger.
+        """
+        return await self.feed_cache.get_or_load(
+            (max_results, page_token, with_bodies, label),
+            lambda: self._fetch_feed_page(max_results, page_token, with_bodies, label),
+            is_cacheable=lambda result: result['status'] == 'success'
+        )
+
+    def peek_blog_posts(
+        self,
+        max_results: int = 10,
+        page_token: Optional[str] = None,
+        with_bodies: bool = True,
+        label: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Return the last fetched copy of a page however old it is, without calling Blogger"""
+        return self.feed_cache.peek((max_results, page_token, with_bodies, label))
+
+    async def _fetch_feed_page(
+        self,
+        max_results: int,
+        page_token: Optional[str],
+        with_bodies: bool = True,
+        label: Optional[str] = None
+    ) -> Dict:
+        result = await self.fetch_posts_page(max_results, page_token=page_token, with_bodies=with_bodies, label=label)
+        if result['status'] == 'success':
+            # Callers only ever see Blogger page tokens wrapped in an opaque cursor
+            next_token = result['data'].pop('nextPageToken', None)
+            result['data'].pop('itemIds', None)
+            result['data']['nextCursor'] = encode_cursor({'pt': next_token}) if next_token else None
+        return result
+
+    async def iter_blog_posts(self, page_size: int = 50, order_by: Optional[str] = None) -> AsyncIterator[Tuple[List[Dict], List[str]]]:
+        """
+        Stream every post page by page, holding only one page in memory at a time.
+
+        Each page comes with the ids of all items Blogger listed on it, which
+        includes posts that could not be processed and are missing from the page.
+        """
+        page_token = None
+        while True:
+            result = await self.fetch_posts_page(page_size, page_token=page_token, order_by=order_by)
+            if result['status'] != 'success':
+                raise BlogFetchError(result['message'])
+            yield result['data']['posts'], result['data']['itemIds']
+            page_token = result['data'].get('nextPageToken')
+            if not page_token:
+                return
+
+    def index_posts(self, posts: List[Dict]) -> None:
+        """Add or refresh processed posts in the id index"""
+        now = time.monotonic()
+        for post in posts:
+            self.label_index.upsert(post)
+            if 'content' not in post:
+                # Body-less listings never replace a full post; detail views fetch bodies lazily
+                continue
+            self.post_index[post['id']] = (post, now)
+            self.post_index.move_to_end(post['id'])
+            self.search_index.upsert(post)
+        while len(self.post_index) > self.post_index_max:
+            self.post_index.popitem(last=False)
+
+    async def get_blog_post(self, post_id: str) -> Dict:
+        """Get a single post from the id index, fetching it from Blogger on a miss"""
+        indexed = self.post_index.get(post_id)
+        if indexed is not None:
+            post, indexed_at = indexed
+            if time.monotonic() - indexed_at < self.cache_duration.total_seconds():
+                return {
+                    'status': 'success',
+                    'data': post
+                }
+
+        result = await self._fetch_blog_post_uncached(post_id)
+        if result['status'] == 'error' and indexed is not None and result.get('message') != 'Blog post not found':
+            # Upstream trouble: an old copy of the post beats an error page
+            logger.warning(f"Serving stale indexed copy of post {post_id}: {result['message']}")
+            return {
+                'status': 'success',
+                'data': indexed[0]
+            }
+        return result
+
+    def peek_blog_post(self, post_id: str) -> Optional[Dict]:
+        """Return the indexed copy of a post however old it is, without calling Blogger"""
+        indexed = self.post_index.get(post_id)
+        if indexed is None:
+            return None
+        return {
+            'status': 'success',
+            'data': indexed[0]
+        }
+
+    async def _fetch_blog_post_uncached(self, post_id: str) -> Dict:
+        """Fetch a single post from the Blogger posts/{postId} resource"""
         try:
             if not self.api_key or not self.blog_id:
                 logger.warning("Google API key or Blog ID not configured")
@@ -111,38 +317,86 @@ class BlogService:
                     'message': 'Blog configuration not available',
                     'data': None
                 }
-            
-            # Construct API URL
-            url = f"{self.base_url}/{self.blog_id}/posts"
-            params = {
-                'key': self.api_key,
-                'maxResults': max_results,
-                'fields': 'items(id,title,content,published,updated,url,author,labels),nextPageToken'
+
+            url = f"{self.base_url}/{self.blog_id}/posts/{quote(post_id, safe='')}"
+            result = await self._get_json(url, {'fields': POST_FIELDS})
+            if result['status'] != 'success':
+                if result['message'] == 'Blog not found':
+                    result['message'] = 'Blog post not found'
+                return result
+
+            post = self.process_blog_post(result['data'])
+            if not post:
+                return {
+                    'status': 'error',
+                    'message': 'Failed to process blog post',
+                    'data': None
+                }
+
+            self.index_posts([post])
+            return {
+                'status': 'success',
+                'data': post
             }
-            
-            # Make API request
-            response = requests.get(url, params=params, timeout=10)
-            
+
+        except Exception as e:
+            logger.error(f"Unexpected error fetching post {post_id}: {str(e)}")
+            return {
+                'status': 'error',
+                'message': 'An unexpected error occurred',
+                'data': None
+            }
+
+    async def start(self) -> None:
+        """Open the pooled upstream HTTP client for the app lifespan"""
+        if self.http_client is None:
+            self.http_client = create_http_client()
+            self.derived_cache.load()
+
+    async def close(self) -> None:
+        """Close the upstream HTTP client and release pooled connections"""
+        self.derived_cache.save()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def _get_json(self, url: str, params: Dict) -> Dict:
+        """GET a Blogger API resource and map failures onto the service's error results"""
+        if not self.breaker.allow():
+            return {
+                'status': 'error',
+                'message': 'Blog service temporarily unavailable',
+                'data': None
+            }
+
+        outcome_recorded = False
+        resource = 'posts' if url.endswith('/posts') else 'post'
+        started = time.perf_counter()
+        outcome = 'aborted'
+        try:
+            if self.http_client is None:
+                await self.start()
+
+            # Send the key as a header so it never appears in logged request URLs
+            response = await self._send(url, params, {'X-Goog-Api-Key': self.api_key})
+            outcome = str(response.status_code)
+
+            # Throttling and server errors mean Blogger is struggling; anything else is a healthy answer
+            if response.status_code == 429 or response.status_code >= 500:
+                self.breaker.record_failure(f'HTTP {response.status_code}')
+            else:
+                self.breaker.record_success()
+            outcome_recorded = True
+
             if response.status_code == 200:
-                data = response.json()
-                posts = []
-                
-                # Process each post
-                if 'items' in data:
-                    for post_data in data['items']:
-                        processed_post = self.process_blog_post(post_data)
-                        if processed_post:
-                            posts.append(processed_post)
-                
                 return {
                     'status': 'success',
-                    'data': {
-                        'posts': posts,
-                        'totalPosts': len(posts),
-                        'lastFetched': datetime.utcnow().isoformat()
-                    }
+                    'data': response.json()
                 }
-            
+
             elif response.status_code == 403:
                 logger.error("Google API access forbidden - check API key and permissions")
                 return {
@@ -150,15 +404,15 @@ class BlogService:
                     'message': 'API access denied - check credentials',
                     'data': None
                 }
-            
+
             elif response.status_code == 404:
-                logger.error("Blog not found - check blog ID")
+                logger.error(f"Blogger resource not found: {url}")
                 return {
                     'status': 'error',
                     'message': 'Blog not found',
                     'data': None
                 }
-            
+
             else:
                 logger.error(f"API request failed with status {response.status_code}: {response.text}")
                 return {
@@ -166,23 +420,153 @@ class BlogService:
                     'message': f'API request failed: {response.status_code}',
                     'data': None
                 }
-                
-        except requests.exceptions.Timeout:
+
+        except httpx.TimeoutException:
+            outcome = 'timeout'
+            self.breaker.record_failure('timeout')
+            outcome_recorded = True
             logger.error("API request timed out")
             return {
                 'status': 'error',
                 'message': 'Request timed out',
                 'data': None
             }
-            
-        except requests.exceptions.RequestException as e:
+
+        except httpx.HTTPError as e:
+            outcome = 'network_error'
+            self.breaker.record_failure(type(e).__name__)
+            outcome_recorded = True
             logger.error(f"Network error: {str(e)}")
             return {
                 'status': 'error',
                 'message': 'Network error occurred',
                 'data': None
             }
+
+        finally:
+            if not outcome_recorded:
+                # Cancelled or failed locally; free the probe slot without judging Blogger
+                self.breaker.release()
+            blogger_request_duration.observe(time.perf_counter() - started, resource, outcome)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or self.breaker.state != CLOSED:
+            # Never double the load on an upstream that is already failing or being probed
+            return None
+        observed = self.latency.percentile(self.hedge_percentile)
+        if observed is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, observed)
+
+    async def _send(self, url: str, params: Dict, headers: Dict) -> httpx.Response:
+        """GET url, sending a hedged duplicate if the first attempt is slower than usual"""
+        started = time.monotonic()
+        attempts = [asyncio.ensure_future(self.http_client.get(url, params=params, headers=headers))]
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    self.hedges += 1
+                    attempts.append(asyncio.ensure_future(self.http_client.get(url, params=params, headers=headers)))
+
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not attempts[0]:
+                            self.hedge_wins += 1
+                        self.latency.observe(time.monotonic() - started)
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def upstream_stats(self) -> Dict:
+        return {
+            'breaker': self.breaker.stats(),
+            'latency': self.latency.stats(),
+            'hedges': self.hedges,
+            'hedgeWins': self.hedge_wins
+        }
+
+    async def fetch_posts_page(
+        self,
+        max_results: int,
+        page_token: Optional[str] = None,
+        order_by: Optional[str] = None,
+        with_bodies: bool = True,
+        label: Optional[str] = None
+    ) -> Dict:
+        """Fetch one page of blog posts from Google Blogger API, bypassing the feed cache"""
+        try:
+            if not self.api_key or not self.blog_id:
+                logger.warning("Google API key or Blog ID not configured")
+                return {
+                    'status': 'error',
+                    'message': 'Blog configuration not available',
+                    'data': None
+                }
+            
+            # Construct API URL
+            url = f"{self.base_url}/{self.blog_id}/posts"
+            params = {
+                'maxResults': max_results,
+                'fields': f'items({POST_FIELDS if with_bodies else POST_SUMMARY_FIELDS}),nextPageToken'
+            }
+            if not with_bodies:
+                params['fetchBodies'] = 'false'
+            if page_token:
+                params['pageToken'] = page_token
+            if order_by:
+                params['orderBy'] = order_by
+            if label:
+                params['labels'] = label
             
+            # Make API request
+            result = await self._get_json(url, params)
+            if result['status'] != 'success':
+                return result
+
+            data = result['data']
+            items = data.get('items', [])
+
+            if not with_bodies and any(
+                self.derived_cache.key_for_post(item.get('id', ''), item.get('updated', '')) not in self.derived_cache
+                for item in items
+            ):
+                # New or edited posts need their bodies once to derive excerpts; list them again with bodies
+                logger.info("Body-less listing has unseen post revisions, fetching bodies")
+                result = await self.fetch_posts_page(max_results, page_token=page_token, order_by=order_by, label=label)
+                if result['status'] == 'success':
+                    # The full posts are indexed, hand out body-less copies
+                    result['data']['posts'] = [
+                        {key: value for key, value in post.items() if key != 'content'}
+                        for post in result['data']['posts']
+                    ]
+                return result
+
+            # Process each post
+            posts = await self.process_blog_posts(items, with_bodies=with_bodies)
+
+            self.index_posts(posts)
+
+            return {
+                'status': 'success',
+                'data': {
+                    'posts': posts,
+                    'totalPosts': len(posts),
+                    'lastFetched': datetime.utcnow().isoformat(),
+                    'nextPageToken': data.get('nextPageToken'),
+                    'itemIds': [item['id'] for item in items if item.get('id')]
+                }
+            }
+                
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             return {
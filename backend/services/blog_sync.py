@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, ReturnDocument
+from services.blog_service import BlogService, BlogFetchError
+from services.cursors import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_ID = 'blogger'
+
+# Bumped when mirrored documents gain fields, forcing one full resync to backfill them
+MIRROR_SCHEMA = 2
+
+# Mirror bookkeeping fields that are never part of an API response
+MIRROR_ONLY_FIELDS = {'_id': 0, 'publishedAt': 0, 'updatedAt': 0, 'syncedAt': 0}
+
+
+def parse_blogger_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Blogger RFC 3339 timestamp into a naive UTC datetime, as stored by MongoDB"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class BlogSyncWorker:
+    """
+    Background task that mirrors the blog into the blog_posts collection.
+
+    Incremental cycles walk Blogger's feed ordered by `updated` and stop at the
+    first post that is not newer than the stored watermark, so each cycle only
+    pulls changed posts. Every `full_sync_every` cycles a full walk also removes
+    posts that were deleted upstream (0 disables periodic full walks; a fresh
+    mirror or schema change still gets one). Once the first sync has completed,
+    the blog routes read from the mirror and never wait on Google.
+
+    Every write to the mirror bumps `changeSeq` in the shared sync state, so
+    workers that did not run the sync still see the mirror change (see
+    `current_version`).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, blog_service: BlogService):
+        self.collection = db.blog_posts
+        self.state_collection = db.blog_sync_state
+        self.blog_service = blog_service
+        self.interval = float(os.environ.get('BLOG_SYNC_INTERVAL_SECONDS', 300))
+        self.full_sync_every = int(os.environ.get('BLOG_SYNC_FULL_EVERY', 24))
+        self.page_size = int(os.environ.get('BLOG_SYNC_PAGE_SIZE', 50))
+        # How long a read of the shared change sequence is trusted before asking MongoDB again
+        self.version_ttl = float(os.environ.get('BLOG_MIRROR_VERSION_TTL_SECONDS', 1))
+
+        self.ready = False
+        # Last seen change sequence of the mirror, so encoded responses know when to rebuild
+        self.version = 0
+        self._version_checked_at: Optional[float] = None
+        self.cycles = 0
+        self.last_sync_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background sync loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def _load_state(self) -> None:
+        try:
+            state = await self.state_collection.find_one({'_id': SYNC_STATE_ID})
+            if state and state.get('lastSyncAt'):
+                self.last_sync_at = state['lastSyncAt']
+                self.version = state.get('changeSeq', 0)
+                self.ready = True
+        except Exception as e:
+            logger.error(f"Failed to load blog sync state: {str(e)}")
+
+    async def _load_indexes(self) -> None:
+        """Fill the search and label indexes from the mirror, so they work before the next full sync"""
+        search_index = self.blog_service.search_index
+        label_index = self.blog_service.label_index
+        try:
+            async for document in self.collection.find({}, MIRROR_ONLY_FIELDS).batch_size(self.page_size):
+                search_index.upsert(document)
+                label_index.upsert(document)
+        except Exception as e:
+            logger.error(f"Failed to load indexes from the blog mirror: {str(e)}")
+            return
+        if self.ready:
+            label_index.complete = True
+        if len(search_index):
+            logger.info(f"Indexes loaded {len(search_index)} posts from the blog mirror")
+
+    async def current_version(self) -> int:
+        """
+        The mirror's change sequence, shared by every worker through the sync state.
+
+        It is read from MongoDB at most once per `version_ttl`; in between, and
+        when the read fails, the last value seen is returned.
+        """
+        loop = asyncio.get_running_loop()
+        if self._version_checked_at is not None and loop.time() - self._version_checked_at < self.version_ttl:
+            return self.version
+        self._version_checked_at = loop.time()
+        try:
+            state = await self.state_collection.find_one({'_id': SYNC_STATE_ID}, {'changeSeq': 1})
+        except Exception as e:
+            logger.error(f"Failed to read the blog mirror change sequence: {str(e)}")
+            return self.version
+        if state is not None:
+            self.version = max(self.version, state.get('changeSeq', 0))
+        return self.version
+
+    async def _bump_version(self) -> None:
+        """Record a write to the mirror in the shared change sequence"""
+        state = await self.state_collection.find_one_and_update(
+            {'_id': SYNC_STATE_ID},
+            {'$inc': {'changeSeq': 1}},
+            projection={'changeSeq': 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.version = max(self.version, state['changeSeq'])
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        # Loading state here rather than in start() keeps a slow MongoDB from delaying app startup
+        await self._load_state()
+        await self._load_indexes()
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Blog sync cycle failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def sync_once(self, full: bool = False) -> Dict:
+        """Run one sync cycle and return a summary of what changed"""
+        state = await self.state_collection.find_one({'_id': SYNC_STATE_ID}) or {}
+        watermark = state.get('watermark')
+        full = (
+            full or watermark is None or state.get('schema') != MIRROR_SCHEMA
+            or (self.full_sync_every > 0 and self.cycles % self.full_sync_every == 0)
+        )
+        self.cycles += 1
+
+        upserted = 0
+        removed = 0
+        seen_ids: List[str] = []
+        newest = watermark
+        try:
+            async for posts, item_ids in self.blog_service.iter_blog_posts(self.page_size, order_by='updated'):
+                if full:
+                    # Raw ids, so a post that failed processing is kept rather than treated as deleted
+                    seen_ids.extend(item_ids)
+                changed = []
+                reached_watermark = False
+                for post in posts:
+                    updated_at = parse_blogger_time(post.get('updated'))
+                    if not full and watermark is not None and updated_at is not None and updated_at <= watermark:
+                        reached_watermark = True
+                        break
+                    changed.append(post)
+                    if updated_at is not None and (newest is None or updated_at > newest):
+                        newest = updated_at
+
+                upserted += await self._upsert(changed)
+                if reached_watermark:
+                    break
+        except BlogFetchError as e:
+            # Leave the mirror untouched, readers keep serving the last synced content
+            self.last_error = str(e)
+            logger.warning(f"Blog sync stopped early: {str(e)}")
+            return {'status': 'error', 'message': str(e)}
+
+        if full:
+            deleted = await self.collection.delete_many({'_id': {'$nin': seen_ids}})
+            removed = deleted.deleted_count
+            if removed:
+                await self._bump_version()
+            self.blog_service.search_index.retain(seen_ids)
+            self.blog_service.label_index.retain(seen_ids)
+            self.blog_service.label_index.complete = True
+
+        now = datetime.utcnow()
+        await self.state_collection.update_one(
+            {'_id': SYNC_STATE_ID},
+            {'$set': {'watermark': newest, 'lastSyncAt': now, 'lastFullSync': full, 'schema': MIRROR_SCHEMA}},
+            upsert=True
+        )
+        self.last_sync_at = now
+        self.last_error = None
+        self.ready = True
+
+        if upserted or removed:
+            logger.info(f"Blog sync ({'full' if full else 'incremental'}) upserted {upserted}, removed {removed} posts")
+        return {'status': 'success', 'upserted': upserted, 'removed': removed, 'full': full}
+
+    async def _upsert(self, posts: List[Dict]) -> int:
+        if not posts:
+            return 0
+        now = datetime.utcnow()
+        operations = []
+        for post in posts:
+            document = dict(post)
+            document['_id'] = post['id']
+            document['publishedAt'] = parse_blogger_time(post.get('published'))
+            document['updatedAt'] = parse_blogger_time(post.get('updated'))
+            document['syncedAt'] = now
+            operations.append(ReplaceOne({'_id': post['id']}, document, upsert=True))
+        await self.collection.bulk_write(operations, ordered=False)
+        await self._bump_version()
+        return len(operations)
+
+    async def list_posts(
+        self,
+        max_results: int = 10,
+        after: Optional[List] = None,
+        fields: Optional[List[str]] = None,
+        label: Optional[str] = None
+    ) -> Dict:
+        """
+        Read a page of posts from the mirror, newest first, starting after a keyset position.
+
+        `fields` limits the returned post fields, so MongoDB never reads out unrequested bodies.
+        `label` keeps only posts with that label, served by the labels index.
+        """
+        query_filter = {}
+        if label:
+            query_filter['labels'] = label
+        if after:
+            published_at, post_id = datetime.fromisoformat(after[0]), after[1]
+            query_filter['$or'] = [
+                {'publishedAt': {'$lt': published_at}},
+                {'publishedAt': published_at, '_id': {'$lt': post_id}}
+            ]
+
+        # Keep _id and publishedAt long enough to build the next cursor
+        if fields:
+            projection = {field: 1 for field in fields}
+            projection['publishedAt'] = 1
+        else:
+            projection = {'updatedAt': 0, 'syncedAt': 0}
+        cursor = self.collection.find(query_filter, projection)
+        cursor = cursor.sort([('publishedAt', -1), ('_id', -1)]).limit(max_results + 1)
+        documents = await cursor.to_list(length=max_results + 1)
+
+        next_cursor = None
+        if len(documents) > max_results:
+            documents = documents[:max_results]
+            last = documents[-1]
+            if last.get('publishedAt') is not None:
+                next_cursor = encode_cursor({'k': [last['publishedAt'].isoformat(), last['_id']]})
+
+        posts = []
+        for document in documents:
+            document.pop('_id', None)
+            document.pop('publishedAt', None)
+            posts.append(document)
+
+        return {
+            'status': 'success',
+            'data': {
+                'posts': posts,
+                'totalPosts': len(posts),
+                'lastFetched': self.last_sync_at.isoformat() if self.last_sync_at else None,
+                'nextCursor': next_cursor
+            }
+        }
+
+    async def get_post(self, post_id: str) -> Dict:
+        """Read a single post from the mirror"""
+        post = await self.collection.find_one({'_id': post_id}, MIRROR_ONLY_FIELDS)
+        if post is None:
+            return {
+                'status': 'error',
+                'message': 'Blog post not found',
+                'data': None
+            }
+        return {
+            'status': 'success',
+            'data': post
+        }
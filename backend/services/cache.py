@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+EVICTION_POLICIES = ('lru', 'lfu', 'fifo')
+
+
+class CacheEntry:
+    __slots__ = ('value', 'stored_at', 'hits')
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.hits = 0
+
+
+class FeedCache:
+    """
+    Process-wide TTL cache with stale-while-revalidate and single-flight loads.
+
+    Fresh entries are returned directly. Entries past their TTL but inside the
+    stale window are returned immediately while one background refresh runs.
+    Concurrent misses for the same key share a single loader call. When a load
+    fails, the last good value (if any) is served instead of the failure.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0, max_entries: int = 32, policy: str = 'lru'):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {EVICTION_POLICIES}")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max(1, max_entries)
+        self.policy = policy
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.load_errors = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        is_cacheable: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Return the cached value for key, loading it through loader when needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._touch(key, entry)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._touch(key, entry)
+                self._start_load(key, loader, is_cacheable)
+                return entry.value
+
+        self.misses += 1
+        task = self._start_load(key, loader, is_cacheable)
+        # Shield the shared load so one cancelled caller does not cancel it for everyone
+        return await asyncio.shield(task)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the stored value for key regardless of age, without loading"""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value for key as freshly loaded, keeping the hit count of the value it replaces"""
+        entry = CacheEntry(value)
+        previous = self._entries.get(key)
+        if previous is not None:
+            # A refresh must not make a popular key look new to LFU eviction
+            entry.hits = previous.hits
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict(keep=key)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'maxEntries': self.max_entries,
+            'policy': self.policy,
+            'hits': self.hits,
+            'staleHits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'loadErrors': self.load_errors,
+            'inflight': len(self._inflight),
+            'hitRatio': (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
+
+    def _start_load(self, key, loader, is_cacheable) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        task = asyncio.ensure_future(self._load(key, loader, is_cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._load_finished(key, done))
+        return task
+
+    def _load_finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so background refresh failures are not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Cache load for {key!r} failed: {task.exception()}")
+
+    async def _load(self, key, loader, is_cacheable) -> Any:
+        self.refreshes += 1
+        previous = self._entries.get(key)
+        try:
+            value = await loader()
+        except Exception as e:
+            self.load_errors += 1
+            if previous is not None:
+                logger.warning(f"Cache load for {key!r} failed, serving last good value: {str(e)}")
+                return previous.value
+            raise
+
+        if is_cacheable(value):
+            self.put(key, value)
+            return value
+
+        self.load_errors += 1
+        if previous is not None:
+            logger.warning(f"Cache load for {key!r} returned an uncacheable result, serving last good value")
+            return previous.value
+        return value
+
+    def _touch(self, key: Hashable, entry: CacheEntry) -> None:
+        entry.hits += 1
+        if self.policy == 'lru':
+            self._entries.move_to_end(key)
+
+    def _evict(self, keep: Hashable) -> None:
+        while len(self._entries) > self.max_entries:
+            if self.policy == 'lfu':
+                # Never evict the entry that was just stored, it has had no chance to collect hits
+                candidates = (k for k in self._entries if k != keep)
+                victim = min(candidates, key=lambda k: self._entries[k].hits)
+                del self._entries[victim]
+            else:
+                self._entries.popitem(last=False)
+
+
+class DerivedFieldCache:
+    """
+    Bounded LRU of fields derived from post HTML, keyed by a hash of the content.
+
+    Unchanged posts skip HTML processing on every feed refresh. When a path is
+    given the cache is loaded from and saved to a JSON file, so a restarted
+    worker starts warm.
+    """
+
+    def __init__(self, max_entries: int = 2048, path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.path = path
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(content: str, updated: str = '') -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(updated.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_for_post(post_id: str, updated: str = '') -> str:
+        """Key derived fields by post revision, for listings fetched without bodies"""
+        digest = hashlib.blake2b(digest_size=16, person=b'post-revision')
+        digest.update(post_id.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(updated.encode('utf-8'))
+        return digest.hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        fields = self._entries.get(key)
+        if fields is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return fields
+
+    def put(self, key: str, fields: Dict) -> None:
+        self._entries[key] = fields
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def load(self) -> None:
+        """Load persisted entries, ignoring a missing or unreadable file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for key, fields in entries.items():
+                self._entries[key] = fields
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            logger.info(f"Loaded {len(self._entries)} derived post fields from {self.path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load derived field cache from {self.path}: {str(e)}")
+
+    def save(self) -> None:
+        """Persist entries atomically if anything changed since the last save"""
+        if not self.path or not self._dirty:
+            return
+        tmp_path = None
+        try:
+            # A unique temporary file per save, so workers sharing the path never write into each other's copy
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix='.derived-', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save derived field cache to {self.path}: {str(e)}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'maxEntries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRatio': self.hits / lookups if lookups else 0.0,
+            'persistent': bool(self.path)
+        }
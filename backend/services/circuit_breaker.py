@@ -0,0 +1,99 @@
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for an upstream dependency.
+
+    After `failure_threshold` failures in a row the circuit opens and callers
+    are turned away immediately. Once `reset_timeout` seconds have passed it
+    goes half-open and lets up to `half_open_probes` requests through. A
+    successful probe closes the circuit again; a failed one reopens it for
+    another `reset_timeout`.
+
+    Callers ask `allow()` before each request and must report its outcome
+    with `record_success()` or `record_failure()`, or with `release()` when
+    the request ended without telling anything about upstream health.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30, half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = max(1, half_open_probes)
+
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_inflight = 0
+
+        self.rejected = 0
+        self.opened = 0
+        self.last_failure: Optional[str] = None
+
+    def allow(self) -> bool:
+        """Return whether a request may go upstream now"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes_inflight = 0
+            logger.info(f"Circuit {self.name} half-open, probing upstream")
+
+        if self.state == HALF_OPEN:
+            if self._probes_inflight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes_inflight += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit {self.name} closed, upstream recovered")
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._probes_inflight = 0
+
+    def record_failure(self, reason: str = '') -> None:
+        self.last_failure = reason or None
+        if self.state == HALF_OPEN:
+            self._trip()
+            return
+        self._consecutive_failures += 1
+        if self.state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def release(self) -> None:
+        """Return a probe slot for a request that was abandoned before it could succeed or fail"""
+        if self.state == HALF_OPEN and self._probes_inflight > 0:
+            self._probes_inflight -= 1
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_inflight = 0
+        self.opened += 1
+        logger.warning(f"Circuit {self.name} open for {self.reset_timeout}s after upstream failures: {self.last_failure}")
+
+    def stats(self) -> Dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+        return {
+            'state': self.state,
+            'consecutiveFailures': self._consecutive_failures,
+            'failureThreshold': self.failure_threshold,
+            'opened': self.opened,
+            'rejected': self.rejected,
+            'retryInSeconds': retry_in,
+            'lastFailure': self.last_failure
+        }
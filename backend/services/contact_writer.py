@@ -0,0 +1,345 @@
+import asyncio
+import fcntl
+import logging
+import os
+import socket
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+from services.message_counts import increment_status_count
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Held with flock by the writer that owns a journal directory for as long as it runs
+LOCK_NAME = '.lock'
+
+
+class WriteBehindFull(Exception):
+    """Raised when the write-behind queue stays full past the enqueue timeout"""
+
+
+class ContactWriteBehind:
+    """
+    Opt-in write-behind queue for contact form submissions.
+
+    Submissions are journaled to disk and queued in memory, then flushed with
+    unordered insert_many once `batch_size` messages are waiting or
+    `flush_interval` seconds have passed. A full queue applies backpressure by
+    making submitters wait up to `enqueue_timeout` before failing. Journal
+    segments are deleted once every message in them is stored, and anything
+    left over from a crash is replayed on start. Message ids are assigned before
+    queueing, so a replay after a partial flush is idempotent.
+
+    Every writer journals into its own `<hostname>-<pid>-<random>` directory under
+    the journal root and holds an exclusive flock on it while running. On start,
+    only directories whose lock can be taken, i.e. whose writer is gone, are
+    replayed, so workers sharing a root never touch each other's segments.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, journal_dir: Optional[str] = None):
+        self.db = db
+        self.max_queue = int(os.environ.get('CONTACT_WRITE_BEHIND_MAX_QUEUE', 1000))
+        self.batch_size = int(os.environ.get('CONTACT_WRITE_BEHIND_BATCH_SIZE', 100))
+        self.flush_interval = float(os.environ.get('CONTACT_WRITE_BEHIND_FLUSH_INTERVAL', 0.5))
+        self.enqueue_timeout = float(os.environ.get('CONTACT_WRITE_BEHIND_ENQUEUE_TIMEOUT', 2))
+        self.journal_max_bytes = int(os.environ.get('CONTACT_WRITE_BEHIND_JOURNAL_MAX_BYTES', 4 * 1024 * 1024))
+        self.fsync = os.environ.get('CONTACT_WRITE_BEHIND_FSYNC', 'false').lower() == 'true'
+        self.journal_root = Path(journal_dir or os.environ.get(
+            'CONTACT_WRITE_BEHIND_DIR',
+            Path(__file__).parent.parent / 'data' / 'contact_journal'
+        ))
+        # A fresh directory per writer, so a reused pid never resumes a dead writer's journal
+        self.journal_dir = self.journal_root / f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock_fd: Optional[int] = None
+
+        # Slots bound queued plus in-flight messages; they are released only once a message is stored
+        self._slots = asyncio.Semaphore(self.max_queue)
+        self._queue: "asyncio.Queue[Tuple[int, Dict]]" = asyncio.Queue()
+        self._segment = 0
+        self._segment_file = None
+        self._outstanding: Dict[int, int] = {}
+        # Messages the flusher has taken off the queue but not yet stored
+        self._batch: List[Tuple[int, Dict]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+        self.submitted = 0
+        self.flushed = 0
+        self.batches = 0
+        self.flush_failures = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        """Replay any journal left by a previous process, then start flushing"""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = self._lock_directory(self.journal_dir, create=True)
+        if self._lock_fd is None:
+            raise RuntimeError(f"Contact journal {self.journal_dir} is locked by another writer")
+        try:
+            await self._replay_journals()
+        except Exception as e:
+            # Unreplayed segments stay on disk and are retried on the next start
+            logger.error(f"Contact journal replay failed: {str(e)}")
+        self._open_segment(self._next_segment_number())
+        self._accepting = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting submissions and flush everything still queued"""
+        self._accepting = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Inserting a batch twice is harmless, duplicate ids are skipped
+        pending, self._batch = self._batch, []
+        while pending or not self._queue.empty():
+            batch = pending or [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            pending = []
+            if not await self._flush(batch):
+                # MongoDB is unavailable; the journal still holds these for the next start
+                logger.error(f"Write-behind shutdown left {self._queue.qsize() + len(batch)} messages in the journal")
+                break
+
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+        if self._lock_fd is not None:
+            if not any(self._outstanding.values()):
+                self._remove_journal_dir()
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def submit(self, document: Dict) -> None:
+        """Queue a contact message document, which must already carry its _id"""
+        if not self._accepting:
+            raise WriteBehindFull("Write-behind queue is not accepting submissions")
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise WriteBehindFull("Contact message queue is full")
+
+        # Journal before queueing so nothing the caller was told is accepted can be lost
+        segment = self._journal(document)
+        self._queue.put_nowait((segment, document))
+        self.submitted += 1
+
+    def stats(self) -> Dict:
+        return {
+            'queued': self._queue.qsize(),
+            'maxQueue': self.max_queue,
+            'submitted': self.submitted,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'flushFailures': self.flush_failures,
+            'rejected': self.rejected,
+            'journalSegments': len(self._outstanding)
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._flush_next_batch()
+            except Exception as e:
+                # Keep flushing: a dead flusher would leave every later submission queued until restart
+                logger.error(f"Write-behind flusher error, retrying: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _flush_next_batch(self) -> None:
+        """Collect a batch, or pick up the one an error interrupted, and store it"""
+        loop = asyncio.get_running_loop()
+        batch = self._batch
+        if not batch:
+            batch = self._batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # asyncio.wait, unlike wait_for on 3.11, never swallows a cancel that races a dequeued message
+            getter = asyncio.ensure_future(self._queue.get())
+            try:
+                done, _ = await asyncio.wait({getter}, timeout=remaining)
+            finally:
+                if getter.done() and not getter.cancelled():
+                    batch.append(getter.result())
+                else:
+                    getter.cancel()
+            if not done:
+                break
+
+        retry_delay = 0.5
+        while not await self._flush(batch):
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 30)
+        self._batch = []
+
+    async def _flush(self, batch: List[Tuple[int, Dict]]) -> bool:
+        documents = [document for _, document in batch]
+        inserted = await self._insert(documents)
+        if inserted is None:
+            self.flush_failures += 1
+            return False
+
+        self.batches += 1
+        self.flushed += len(documents)
+        await self._count_stored(inserted)
+        for segment, _ in batch:
+            self._outstanding[segment] -= 1
+            self._slots.release()
+        try:
+            self._release_segments()
+        except OSError as e:
+            # The batch is stored; fully flushed segments are released again after the next batch
+            logger.error(f"Failed to release contact journal segments: {str(e)}")
+        return True
+
+    async def _count_stored(self, inserted: int) -> None:
+        """Add newly stored messages to the per-status totals, which are rebuilt at boot if this fails"""
+        if not inserted:
+            return
+        try:
+            await increment_status_count(self.db, 'new', inserted)
+        except Exception as e:
+            logger.error(f"Failed to count {inserted} stored contact messages: {str(e)}")
+
+    async def _insert(self, documents: List[Dict]) -> Optional[int]:
+        """Insert documents unordered, returning how many were new or None if the batch must be retried"""
+        try:
+            result = await self.db.contact_messages.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if all(error.get('code') == DUPLICATE_KEY_ERROR for error in errors):
+                # Already stored by an earlier attempt or replay
+                return e.details.get('nInserted', 0)
+            logger.error(f"Write-behind flush failed: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Write-behind flush failed: {str(e)}")
+            return None
+
+    def _journal(self, document: Dict) -> int:
+        if self._segment_file.tell() >= self.journal_max_bytes:
+            self._open_segment(self._segment + 1)
+        self._segment_file.write(json_util.dumps(document) + '\n')
+        self._segment_file.flush()
+        if self.fsync:
+            os.fsync(self._segment_file.fileno())
+        self._outstanding[self._segment] = self._outstanding.get(self._segment, 0) + 1
+        return self._segment
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.journal_dir / f"segment-{segment:08d}.jsonl"
+
+    def _next_segment_number(self) -> int:
+        existing = [int(path.stem.split('-')[1]) for path in self.journal_dir.glob('segment-*.jsonl')]
+        return max(existing, default=-1) + 1
+
+    def _open_segment(self, segment: int) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment = segment
+        self._segment_file = open(self._segment_path(segment), 'a', encoding='utf-8')
+        self._outstanding.setdefault(segment, 0)
+
+    def _release_segments(self) -> None:
+        for segment, outstanding in list(self._outstanding.items()):
+            if outstanding > 0:
+                continue
+            if segment == self._segment:
+                # Everything in the live segment is stored, start it over
+                self._segment_file.seek(0)
+                self._segment_file.truncate()
+            else:
+                self._segment_path(segment).unlink(missing_ok=True)
+                del self._outstanding[segment]
+
+    def _remove_journal_dir(self) -> None:
+        """Delete this writer's journal once everything in it is stored"""
+        for segment in self._outstanding:
+            self._segment_path(segment).unlink(missing_ok=True)
+        (self.journal_dir / LOCK_NAME).unlink(missing_ok=True)
+        try:
+            self.journal_dir.rmdir()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _lock_directory(directory: Path, create: bool = False) -> Optional[int]:
+        """Take the exclusive lock of a journal directory, or return None if another process holds it"""
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try:
+            fd = os.open(directory / LOCK_NAME, flags, 0o644)
+        except FileNotFoundError:
+            # Not locked yet by a writer that is starting, or already cleaned up by a replay
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    async def _replay_journals(self) -> None:
+        """Replay the journals of writers that are no longer running"""
+        # Segments written straight into the root before journals were per process
+        root_fd = self._lock_directory(self.journal_root, create=True)
+        if root_fd is not None:
+            try:
+                await self._replay_segments(self.journal_root)
+            finally:
+                os.close(root_fd)
+
+        for directory in sorted(path for path in self.journal_root.iterdir() if path.is_dir()):
+            if directory == self.journal_dir:
+                continue
+            fd = self._lock_directory(directory)
+            if fd is None:
+                # Its writer is alive and still appending
+                continue
+            try:
+                await self._replay_segments(directory)
+                (directory / LOCK_NAME).unlink(missing_ok=True)
+                try:
+                    directory.rmdir()
+                except OSError:
+                    pass
+            finally:
+                os.close(fd)
+
+    async def _replay_segments(self, directory: Path) -> None:
+        for path in sorted(directory.glob('segment-*.jsonl')):
+            documents = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            documents.append(json_util.loads(line))
+                        except ValueError:
+                            # A torn final line from a crash mid-write
+                            logger.warning(f"Skipping unreadable journal line in {path.name}")
+
+            for start in range(0, len(documents), self.batch_size):
+                chunk = documents[start:start + self.batch_size]
+                inserted = await self._insert(chunk)
+                if inserted is None:
+                    raise RuntimeError(f"Could not replay contact journal {path.name}")
+                await self._count_stored(inserted)
+
+            if documents:
+                logger.info(f"Replayed {len(documents)} journaled contact messages from {path.name}")
+            path.unlink()
@@ -0,0 +1,21 @@
+import base64
+import json
+from typing import Dict
+
+
+def encode_cursor(payload: Dict) -> str:
+    """Encode a pagination position as an opaque, URL-safe cursor string"""
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(payload, dict):
+        raise ValueError('Invalid cursor')
+    return payload
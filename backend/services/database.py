@@ -0,0 +1,119 @@
+import os
+import logging
+import threading
+from typing import Dict
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from services.metrics import mongo_command_events
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so pool health can be inspected at runtime"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            'poolsCreated': 0,
+            'poolsCleared': 0,
+            'connectionsCreated': 0,
+            'connectionsClosed': 0,
+            'checkOuts': 0,
+            'checkOutFailures': 0,
+            'checkedOut': 0
+        }
+
+    def _bump(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += delta
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._counts)
+        counts['open'] = counts['connectionsCreated'] - counts['connectionsClosed']
+        return counts
+
+    def pool_created(self, event):
+        self._bump('poolsCreated')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump('poolsCleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump('connectionsCreated')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump('connectionsClosed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump('checkOutFailures')
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._counts['checkOuts'] += 1
+            self._counts['checkedOut'] += 1
+
+    def connection_checked_in(self, event):
+        self._bump('checkedOut', -1)
+
+
+pool_stats = PoolStatsListener()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Queues the duration of every MongoDB command for the /metrics histograms"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_events.append((event.command_name, 'success', event.duration_micros / 1e6))
+
+    def failed(self, event):
+        mongo_command_events.append((event.command_name, 'failure', event.duration_micros / 1e6))
+
+
+command_metrics = CommandMetricsListener()
+
+
+def create_motor_client(mongo_url: str) -> AsyncIOMotorClient:
+    """
+    Build the single Motor client shared by every router for the app lifespan.
+
+    Pool size, timeouts and wire compression come from MONGO_* variables.
+    """
+    options = {
+        'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+        'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', 2)),
+        'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000)),
+        'connectTimeoutMS': int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        'socketTimeoutMS': int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 10000)),
+        'waitQueueTimeoutMS': int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+        'event_listeners': [pool_stats, command_metrics]
+    }
+    compressors = os.environ.get('MONGO_COMPRESSORS', '').strip()
+    if compressors:
+        # zlib needs nothing extra; snappy and zstd need python-snappy / zstandard installed
+        options['compressors'] = compressors
+
+    return AsyncIOMotorClient(mongo_url, **options)
+
+
+async def get_database(request: Request) -> AsyncIOMotorDatabase:
+    """Database dependency backed by the app-wide client created at startup"""
+    return request.app.state.db
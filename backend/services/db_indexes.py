@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from services.status_storage import ensure_status_collection, status_check_indexes
+
+logger = logging.getLogger(__name__)
+
+# Indexes the app owns are name-prefixed so reconciliation never touches anything created by hand
+INDEX_PREFIX = 'app_'
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    'contact_messages': [
+        IndexModel([('status', ASCENDING), ('submittedAt', DESCENDING), ('_id', DESCENDING)], name='app_status_submittedAt_id'),
+        IndexModel([('submittedAt', DESCENDING), ('_id', DESCENDING)], name='app_submittedAt_id'),
+    ],
+    'status_checks': status_check_indexes(timeseries=False),
+    'blog_posts': [
+        IndexModel([('publishedAt', DESCENDING), ('_id', DESCENDING)], name='app_publishedAt_id'),
+        IndexModel([('labels', ASCENDING), ('publishedAt', DESCENDING), ('_id', DESCENDING)], name='app_labels_publishedAt_id'),
+    ],
+}
+
+# The admin queries whose plans must stay index-backed: (collection, description, filter, sort)
+ADMIN_QUERIES = [
+    ('contact_messages', 'list messages', {}, [('submittedAt', DESCENDING), ('_id', DESCENDING)]),
+    ('contact_messages', 'list messages by status', {'status': 'new'}, [('submittedAt', DESCENDING), ('_id', DESCENDING)]),
+    ('status_checks', 'list status checks', {}, [('timestamp', ASCENDING), ('_id', ASCENDING)]),
+    ('blog_posts', 'list mirrored posts', {}, [('publishedAt', DESCENDING), ('_id', DESCENDING)]),
+    ('blog_posts', 'list mirrored posts by label', {'labels': 'AI/ML'}, [('publishedAt', DESCENDING), ('_id', DESCENDING)]),
+]
+
+# Index options that change an index's behaviour, compared during reconciliation
+_COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def _same_index(existing: Dict, model: IndexModel) -> bool:
+    declared = model.document
+    if [tuple(field) for field in existing['key']] != list(declared['key'].items()):
+        return False
+    return all(existing.get(option) == declared.get(option) for option in _COMPARED_OPTIONS)
+
+
+async def reconcile_indexes(db: AsyncIOMotorDatabase, overrides: Optional[Dict[str, List[IndexModel]]] = None) -> Dict:
+    """
+    Create missing app indexes, rebuild changed ones and drop ones no longer declared.
+
+    `overrides` replaces the declared indexes of individual collections, for
+    collections whose indexes depend on how they were created.
+    """
+    summary = {}
+    for collection_name, models in {**INDEXES, **(overrides or {})}.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        declared = {model.document['name']: model for model in models}
+
+        dropped = []
+        for name, info in existing.items():
+            if not name.startswith(INDEX_PREFIX):
+                continue
+            if name not in declared or not _same_index(info, declared[name]):
+                await collection.drop_index(name)
+                dropped.append(name)
+
+        to_create = [
+            model for name, model in declared.items()
+            if name not in existing or name in dropped
+        ]
+        if to_create:
+            await collection.create_indexes(to_create)
+
+        created = [model.document['name'] for model in to_create]
+        if created or dropped:
+            logger.info(f"Reconciled indexes on {collection_name}: created {created}, dropped {dropped}")
+        summary[collection_name] = {'created': created, 'dropped': dropped}
+    return summary
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    stages = [plan.get('stage', '')]
+    for child_key in ('inputStage', 'queryPlan'):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_admin_queries(db: AsyncIOMotorDatabase) -> List[Dict]:
+    """Explain each admin query and flag plans that scan the collection or sort in memory"""
+    reports = []
+    for collection_name, description, query_filter, sort in ADMIN_QUERIES:
+        explained = await db[collection_name].find(query_filter).sort(sort).limit(50).explain()
+        winning_plan = explained['queryPlanner']['winningPlan']
+        stages = _plan_stages(winning_plan)
+        reports.append({
+            'collection': collection_name,
+            'query': description,
+            'stages': stages,
+            'indexed': 'COLLSCAN' not in stages and 'SORT' not in stages
+        })
+    return reports
+
+
+async def index_usage(db: AsyncIOMotorDatabase) -> Dict[str, List[Dict]]:
+    """Report per-index access counts since each index was last loaded"""
+    usage = {}
+    for collection_name in INDEXES:
+        stats = []
+        async for entry in db[collection_name].aggregate([{'$indexStats': {}}]):
+            stats.append({
+                'name': entry['name'],
+                'ops': entry['accesses']['ops'],
+                'since': entry['accesses']['since'].isoformat()
+            })
+        usage[collection_name] = sorted(stats, key=lambda item: item['name'])
+    return usage
+
+
+async def _main(command: str) -> Dict:
+    from dotenv import load_dotenv
+    from services.database import create_motor_client
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = create_motor_client(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        if command == 'reconcile':
+            timeseries = await ensure_status_collection(db)
+            return await reconcile_indexes(db, {'status_checks': status_check_indexes(timeseries)})
+        return {
+            'plans': await explain_admin_queries(db),
+            'usage': await index_usage(db)
+        }
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    # Run from the backend directory: python -m services.db_indexes [report|reconcile]
+    parser = argparse.ArgumentParser(description='Manage and inspect the MongoDB indexes the app relies on')
+    parser.add_argument('command', nargs='?', choices=['report', 'reconcile'], default='report')
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_main(args.command)), indent=2, default=str))
@@ -0,0 +1,64 @@
+import re
+from html import unescape
+from typing import Dict, List, NamedTuple, Optional
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+_TAG = re.compile(r'<[^>]+>')
+_IMG_SRC = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']')
+
+
+class ProcessedContent(NamedTuple):
+    excerpt: str
+    word_count: int
+    featured_image: Optional[str]
+    plain_text: str
+
+
+def process_html(content: str) -> ProcessedContent:
+    """
+    Derive excerpt, word count, featured image and plain text from post HTML.
+
+    Tags are stripped once and the resulting text is unescaped and split once;
+    every derived field is cut from that single word list. The image search
+    stops at the first match, which is normally near the top of the post.
+    """
+    text = _TAG.sub('', content)
+    if '&' in text:
+        text = unescape(text)
+    words = text.split()
+    plain_text = ' '.join(words)
+
+    if len(plain_text) > EXCERPT_LENGTH:
+        excerpt = plain_text[:EXCERPT_LENGTH] + "..."
+    else:
+        excerpt = plain_text
+
+    img_match = _IMG_SRC.search(content)
+    featured_image = img_match.group(1) if img_match else None
+
+    return ProcessedContent(excerpt, len(words), featured_image, plain_text)
+
+
+def format_read_time(word_count: int) -> str:
+    """Format an estimated read time at 200 words per minute"""
+    read_time_minutes = -(-word_count // WORDS_PER_MINUTE)
+    if read_time_minutes <= 1:
+        return "1 min read"
+    return f"{read_time_minutes} min read"
+
+
+def derive_post_fields(content: str) -> Dict:
+    """Compute the API fields that depend only on a post's HTML content"""
+    processed = process_html(content)
+    return {
+        'excerpt': processed.excerpt,
+        'readTime': format_read_time(processed.word_count),
+        'featuredImage': processed.featured_image
+    }
+
+
+def derive_post_fields_batch(contents: List[str]) -> List[Dict]:
+    """Derive fields for a chunk of posts, run inside process pool workers"""
+    return [derive_post_fields(content) for content in contents]
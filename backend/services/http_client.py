@@ -0,0 +1,39 @@
+import httpx
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.environ.get(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the pooled async HTTP client used for Blogger API calls.
+
+    Connections are kept alive between requests so concurrent blog requests
+    reuse warm TLS sessions instead of handshaking with Google every time.
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get('BLOGGER_HTTP_MAX_CONNECTIONS', 20)),
+        max_keepalive_connections=int(os.environ.get('BLOGGER_HTTP_MAX_KEEPALIVE', 10)),
+        keepalive_expiry=float(os.environ.get('BLOGGER_HTTP_KEEPALIVE_EXPIRY', 60))
+    )
+    timeout = httpx.Timeout(
+        connect=float(os.environ.get('BLOGGER_HTTP_CONNECT_TIMEOUT', 3)),
+        read=float(os.environ.get('BLOGGER_HTTP_READ_TIMEOUT', 10)),
+        write=float(os.environ.get('BLOGGER_HTTP_WRITE_TIMEOUT', 10)),
+        pool=float(os.environ.get('BLOGGER_HTTP_POOL_TIMEOUT', 5))
+    )
+
+    http2 = _env_bool('BLOGGER_HTTP2', 'true')
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested for Blogger client but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class LabelIndex:
+    """
+    Per-label post counts for the categories endpoint.
+
+    Each post's labels are remembered so edits and deletions move the counts.
+    Listings filtered by label are not served from here: the mirror queries
+    its (labels, publishedAt, _id) index and the live path passes the label
+    to Blogger. `complete` is set once the index has been built from a full
+    walk of the blog (the mirror or a full sync); until then counts only cover
+    the posts seen so far.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._posts: Dict[str, Tuple[str, ...]] = {}
+        self._categories: Optional[List[Dict]] = None
+        self.complete = False
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def upsert(self, post: Dict) -> None:
+        post_id = post.get('id')
+        if not post_id:
+            return
+        labels = tuple(dict.fromkeys(post.get('labels') or ()))
+        if self._posts.get(post_id) == labels:
+            return
+        self.remove(post_id)
+        for label in labels:
+            self._counts[label] = self._counts.get(label, 0) + 1
+        self._posts[post_id] = labels
+        self._categories = None
+
+    def remove(self, post_id: str) -> None:
+        labels = self._posts.pop(post_id, None)
+        if labels is None:
+            return
+        for label in labels:
+            self._counts[label] -= 1
+            if not self._counts[label]:
+                del self._counts[label]
+        self._categories = None
+
+    def retain(self, post_ids: Iterable[str]) -> None:
+        keep = set(post_ids)
+        for post_id in [post_id for post_id in self._posts if post_id not in keep]:
+            self.remove(post_id)
+
+    def categories(self) -> List[Dict]:
+        """Every label with its post count, most used first; recomputed only after changes"""
+        if self._categories is None:
+            self._categories = sorted(
+                ({'label': label, 'count': count} for label, count in self._counts.items()),
+                key=lambda category: (-category['count'], category['label'].lower())
+            )
+        return self._categories
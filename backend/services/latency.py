@@ -0,0 +1,33 @@
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of recent upstream call durations, used to pick hedging delays"""
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: "deque[float]" = deque(maxlen=max(1, window))
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Nearest-rank percentile in seconds, or None until enough calls have been seen"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+    def stats(self) -> Dict:
+        def as_ms(percent: float) -> Optional[float]:
+            value = self.percentile(percent)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            'samples': len(self._samples),
+            'p50Ms': as_ms(50),
+            'p95Ms': as_ms(95),
+            'p99Ms': as_ms(99)
+        }
@@ -0,0 +1,174 @@
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+import types
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+# Objects that are shared by the whole process rather than owned by a cache
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.CodeType)
+
+
+def deep_sizeof(obj, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes held by `obj` and everything reachable through containers, __dict__ and __slots__.
+
+    Objects already in `seen` are not counted again, so passing one set across
+    several calls gives sizes without double-counting shared objects.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        # Copy before walking: the caches may be changed by other requests between awaits
+        if isinstance(current, dict):
+            for key, value in list(current.items()):
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(current, (list, tuple, set, frozenset)) or type(current).__name__ == 'deque':
+            stack.extend(list(current))
+        elif isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+
+        instance_dict = getattr(current, '__dict__', None)
+        if isinstance(instance_dict, dict):
+            stack.append(instance_dict)
+        for slot in getattr(type(current), '__slots__', ()):
+            value = getattr(current, slot, None)
+            if value is not None:
+                stack.append(value)
+    return total
+
+
+def memory_report(components: Dict[str, object]) -> Dict:
+    """
+    Deep size of each named component plus their deduplicated total.
+
+    Components share objects (the post index holds the same post dicts as
+    the feed cache), so per-component sizes can add up to more than `total`.
+    """
+    shared: Set[int] = set()
+    sizes = {}
+    total = 0
+    for name, component in components.items():
+        sizes[name] = deep_sizeof(component)
+        total += deep_sizeof(component, shared)
+    return {
+        'components': sizes,
+        'totalBytes': total,
+        'process': process_memory()
+    }
+
+
+def process_memory() -> Dict:
+    """Resident set size of this worker, with garbage collector generation counts"""
+    rss = None
+    try:
+        with open('/proc/self/statm') as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    return {
+        'rssBytes': rss,
+        'gcCounts': list(gc.get_count()),
+        'tracemalloc': tracemalloc.is_tracing()
+    }
+
+
+# Frames from the tracing machinery itself, left out of snapshot statistics
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+
+def _stat_entry(stat) -> Dict:
+    return {
+        'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        'sizeBytes': stat.size,
+        'count': stat.count
+    }
+
+
+def _diff_entry(stat) -> Dict:
+    return {
+        **_stat_entry(stat),
+        'sizeDiffBytes': stat.size_diff,
+        'countDiff': stat.count_diff
+    }
+
+
+class SnapshotStore:
+    """Keeps the last few tracemalloc snapshots taken on demand so they can be diffed"""
+
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 1
+
+    def start(self, frames: int) -> bool:
+        """Start tracing allocations; returns False if tracing was already on"""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        return True
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    async def take(self) -> Dict:
+        """Take a snapshot in a worker thread, since it walks every traced block"""
+        snapshot = await asyncio.to_thread(lambda: tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS))
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot_id = self._next_id
+        self._next_id += 1
+        taken_at = datetime.utcnow()
+        self._snapshots[snapshot_id] = (snapshot, taken_at)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return {
+            'id': snapshot_id,
+            'takenAt': taken_at.isoformat(),
+            'tracedBytes': current,
+            'peakTracedBytes': peak
+        }
+
+    def get(self, snapshot_id: int):
+        entry = self._snapshots.get(snapshot_id)
+        return entry[0] if entry else None
+
+    def previous_id(self, snapshot_id: int) -> Optional[int]:
+        earlier = [existing for existing in self._snapshots if existing < snapshot_id]
+        return earlier[-1] if earlier else None
+
+    def list(self) -> List[Dict]:
+        return [{'id': snapshot_id, 'takenAt': taken_at.isoformat()} for snapshot_id, (_, taken_at) in self._snapshots.items()]
+
+    async def top(self, snapshot_id: int, key_type: str, limit: int) -> Optional[List[Dict]]:
+        """The largest allocation sites in a snapshot, or None if it is unknown"""
+        snapshot = self.get(snapshot_id)
+        if snapshot is None:
+            return None
+        stats = await asyncio.to_thread(snapshot.statistics, key_type)
+        return [_stat_entry(stat) for stat in stats[:limit]]
+
+    async def diff(self, snapshot_id: int, baseline_id: int, key_type: str, limit: int) -> Optional[List[Dict]]:
+        """The allocation sites that grew or shrank most since the baseline, or None if either is unknown"""
+        snapshot, baseline = self.get(snapshot_id), self.get(baseline_id)
+        if snapshot is None or baseline is None:
+            return None
+        stats = await asyncio.to_thread(snapshot.compare_to, baseline, key_type)
+        return [_diff_entry(stat) for stat in stats[:limit]]
@@ -0,0 +1,44 @@
+import logging
+from typing import Dict
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_STATUSES = ("new", "read", "responded")
+
+
+async def increment_status_count(db: AsyncIOMotorDatabase, status: str, delta: int = 1) -> None:
+    """Adjust the stored message total for one status"""
+    await db.contact_message_counts.update_one(
+        {'_id': status},
+        {'$inc': {'count': delta}},
+        upsert=True
+    )
+
+
+async def move_status_count(db: AsyncIOMotorDatabase, old_status: str, new_status: str, count: int = 1) -> None:
+    """Move messages from one status total to another"""
+    if old_status == new_status or count == 0:
+        return
+    await increment_status_count(db, old_status, -count)
+    await increment_status_count(db, new_status, count)
+
+
+async def rebuild_status_counts(db: AsyncIOMotorDatabase) -> Dict[str, int]:
+    """Recount messages per status from contact_messages and store the totals"""
+    counts = {status: 0 for status in MESSAGE_STATUSES}
+    async for group in db.contact_messages.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]):
+        counts[group['_id']] = group['count']
+
+    for status, count in counts.items():
+        await db.contact_message_counts.update_one({'_id': status}, {'$set': {'count': count}}, upsert=True)
+    await db.contact_message_counts.delete_many({'_id': {'$nin': list(counts)}})
+    return counts
+
+
+async def get_status_counts(db: AsyncIOMotorDatabase) -> Dict[str, int]:
+    """Read the maintained per-status totals, building them on first use"""
+    counts = {document['_id']: document['count'] async for document in db.contact_message_counts.find()}
+    if not counts:
+        counts = await rebuild_status_counts(db)
+    return counts
@@ -0,0 +1,233 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; the Prometheus client defaults, which span cached hits to slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (labels, value) pairs reported by a collector at scrape time
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, values: tuple, **extra) -> str:
+        return _format_labels({**dict(zip(self.labelnames, values)), **extra})
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """The sample lines of this metric, without its HELP and TYPE header"""
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set"""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        return [f'{self.name}{self._labels(labels)} {_format_value(value)}' for labels, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value per label set that can go up and down"""
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets per label set, plus their sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._labels(labels, le=_format_value(bound))} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{self._labels(labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered together in the Prometheus text format.
+
+    Updates are plain dict and int operations without locks: they all happen on
+    the event loop thread. Events raised on other threads, like pymongo's
+    command monitoring, are queued and folded in on the loop (see `drain`).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = []
+        self._drains: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Samples]]]) -> None:
+        """Register a callable yielding (name, type, help, samples) families, read at scrape time"""
+        self._collectors.append(collector)
+
+    def add_drain(self, drain: Callable[[], None]) -> None:
+        """Register a callable that folds queued cross-thread events into metrics"""
+        self._drains.append(drain)
+
+    def drain(self) -> None:
+        for drain in self._drains:
+            drain()
+
+    def render(self) -> str:
+        self.drain()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(f'{name}{_format_labels(labels)} {_format_value(value)}' for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    'http_requests_total', 'HTTP requests handled, by method, route template and status', ('method', 'route', 'status'))
+http_requests_in_progress = registry.gauge(
+    'http_requests_in_progress', 'HTTP requests currently being handled, by method', ('method',))
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency, by method, route template and status', ('method', 'route', 'status'))
+
+blogger_request_duration = registry.histogram(
+    'blogger_request_duration_seconds', 'Blogger API call latency including hedges, by resource and outcome', ('resource', 'outcome'))
+
+mongo_command_duration = registry.histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency, by command and outcome', ('command', 'outcome'))
+
+# (command, outcome, seconds) appended by pymongo's monitoring threads; deque appends are thread-safe
+mongo_command_events: deque = deque(maxlen=100000)
+
+
+def _drain_mongo_commands() -> None:
+    while True:
+        try:
+            command, outcome, seconds = mongo_command_events.popleft()
+        except IndexError:
+            return
+        mongo_command_duration.observe(seconds, command, outcome)
+
+
+registry.add_drain(_drain_mongo_commands)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording count, in-flight requests and latency per route.
+
+    Requests are labelled with the matched route template, e.g.
+    `/api/blog/posts/{post_id}`, so ids in paths do not multiply series.
+    Latency runs until the last body chunk is sent.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        started = time.perf_counter()
+        status = 500
+        finished: Optional[float] = None
+
+        async def send_wrapper(message):
+            nonlocal status, finished
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                finished = time.perf_counter()
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.dec(method)
+            route = scope.get('route')
+            template = getattr(route, 'path_format', None) or getattr(route, 'path', None) or 'unmatched'
+            labels = (method, template, str(status))
+            http_requests.inc(*labels)
+            http_request_duration.observe((finished or time.perf_counter()) - started, *labels)
+            self.registry.drain()
@@ -0,0 +1,222 @@
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = 'cprofile'
+SAMPLING = 'sampling'
+PROFILE_MODES = (CPROFILE, SAMPLING)
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    Stacks are counted in the collapsed format used by flamegraph.pl and
+    speedscope: one `frame;frame;frame count` line per distinct stack.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and writes their traces to PROFILE_DIR.
+
+    A request is profiled when it carries the admin token in `X-Profile-Token`
+    or is picked by the sample rate, and its path starts with one of the
+    profiled prefixes. Only one request is profiled at a time; both profilers
+    see the whole event loop thread, so requests running concurrently on the
+    same worker show up in the trace too.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        mode: str = CPROFILE,
+        paths: Sequence[str] = (),
+        sample_interval: float = 0.005,
+        max_files: int = 200,
+        max_age: float = 86400
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.directory = Path(directory)
+        self.token = token
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.paths = tuple(paths)
+        self.sample_interval = sample_interval
+        self.max_files = max_files
+        self.max_age = max_age
+        self.profiled = 0
+        self.skipped_busy = 0
+        self._active = False
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            directory=os.environ.get('PROFILE_DIR', '/tmp/portfolio-profiles'),
+            token=os.environ.get('PROFILE_TOKEN') or None,
+            sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+            mode=os.environ.get('PROFILE_MODE', CPROFILE),
+            paths=[path.strip() for path in os.environ.get('PROFILE_PATHS', '/api/blog/,/api/contact,/api/status').split(',') if path.strip()],
+            sample_interval=float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 5)) / 1000,
+            max_files=int(os.environ.get('PROFILE_MAX_FILES', 200)),
+            max_age=float(os.environ.get('PROFILE_MAX_AGE_HOURS', 24)) * 3600
+        )
+
+    def requested_mode(self, path: str, headers: Dict[bytes, bytes]) -> Optional[str]:
+        """The mode to profile a request in, or None to leave it alone"""
+        if not path.startswith(self.paths):
+            return None
+        supplied = headers.get(b'x-profile-token')
+        if supplied is not None and self.token and hmac.compare_digest(supplied, self.token.encode()):
+            mode = headers.get(b'x-profile-mode', b'').decode('latin-1')
+            return mode if mode in PROFILE_MODES else self.mode
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def acquire(self) -> bool:
+        if self._active:
+            self.skipped_busy += 1
+            return False
+        self._active = True
+        return True
+
+    def release(self) -> None:
+        self._active = False
+
+    def output_path(self, method: str, path: str, mode: str) -> Path:
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')[:80] or 'root'
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        suffix = '.prof' if mode == CPROFILE else '.folded'
+        return self.directory / f"{stamp}-{method}-{slug}{suffix}"
+
+    def write(self, target: Path, collected) -> None:
+        """Write one trace and apply retention; runs in a worker thread"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if isinstance(collected, cProfile.Profile):
+            collected.dump_stats(str(target))
+        else:
+            target.write_text(collected.folded())
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete traces past PROFILE_MAX_AGE_HOURS and the oldest beyond PROFILE_MAX_FILES"""
+        traces = sorted(
+            (entry for entry in self.directory.iterdir() if entry.suffix in ('.prof', '.folded')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for position, entry in enumerate(traces):
+            if position >= self.max_files or entry.stat().st_mtime < cutoff:
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        return {
+            'directory': str(self.directory),
+            'mode': self.mode,
+            'sampleRate': self.sample_rate,
+            'tokenEnabled': bool(self.token),
+            'profiled': self.profiled,
+            'skippedBusy': self.skipped_busy
+        }
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests with cProfile or stack sampling.
+
+    Only installed when PROFILE_ENABLED is true, so it adds nothing otherwise.
+    Token-triggered responses carry the trace file name in `X-Profile-File`.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope['headers'])
+        mode = self.profiler.requested_mode(scope['path'], headers)
+        if mode is None or not self.profiler.acquire():
+            await self.app(scope, receive, send)
+            return
+
+        target = self.profiler.output_path(scope['method'], scope['path'], mode)
+        announce = b'x-profile-token' in headers
+
+        async def send_wrapper(message):
+            if announce and message['type'] == 'http.response.start':
+                message.setdefault('headers', [])
+                message['headers'] = list(message['headers']) + [(b'x-profile-file', target.name.encode())]
+            await send(message)
+
+        if mode == CPROFILE:
+            collected = cProfile.Profile()
+            collected.enable()
+        else:
+            collected = StackSampler(threading.get_ident(), self.profiler.sample_interval)
+            collected.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if mode == CPROFILE:
+                collected.disable()
+            else:
+                collected.stop()
+            self.profiler.release()
+            self.profiler.profiled += 1
+            try:
+                await asyncio.to_thread(self.profiler.write, target, collected)
+            except Exception as e:
+                logger.error(f"Failed to write profile {target.name}: {str(e)}")
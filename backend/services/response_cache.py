@@ -0,0 +1,176 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Hashable, Optional
+from fastapi import Request, Response
+from services.serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip alone is served without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth a compressed variant
+MIN_COMPRESS_BYTES = 1024
+
+
+class EncodedBody:
+    __slots__ = ('version', 'source', 'fingerprint', 'etag', 'last_modified', 'identity', 'gzip', 'br')
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    encodings = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name] = quality
+    return encodings
+
+
+class EncodedResponseCache:
+    """
+    Serialized and precompressed JSON bodies for responses that rarely change.
+
+    Each key holds one body in identity, gzip and (when the brotli package is
+    installed) brotli form, with a weak ETag derived from the content. Callers
+    pass a `version` that changes whenever the underlying data may have
+    changed; while it matches, requests are answered from the stored bytes
+    with no encoding work. When the version moves but the content fingerprint
+    is unchanged, the existing variants, ETag and Last-Modified are kept, so
+    clients keep getting 304s.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, max_entries)
+        self.gzip_level = int(os.environ.get('RESPONSE_GZIP_LEVEL', 9))
+        self.brotli_quality = int(os.environ.get('RESPONSE_BROTLI_QUALITY', 9))
+        self._entries: "OrderedDict[Hashable, EncodedBody]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.encodes = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[EncodedBody]:
+        """Return the stored body for key if it was built from this version"""
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def put(self, key: Hashable, version: Hashable, payload: Any, fingerprint: Any = None, source: Any = None) -> EncodedBody:
+        """
+        Store payload for key and return its encoded body.
+
+        `fingerprint` is what the ETag is computed from, defaulting to the
+        whole payload; pass the stable part when the payload carries volatile
+        fields such as fetch times. `source` is kept referenced alongside the
+        entry, which keeps identity-based versions from being reused.
+        """
+        digest = hashlib.blake2b(dumps(payload if fingerprint is None else fingerprint), digest_size=16).hexdigest()
+        previous = self._entries.get(key)
+        if previous is not None and previous.fingerprint == digest:
+            previous.version = version
+            previous.source = source
+            self._entries.move_to_end(key)
+            return previous
+
+        entry = EncodedBody()
+        entry.version = version
+        entry.source = source
+        entry.fingerprint = digest
+        entry.etag = f'W/"{digest}"'
+        entry.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        entry.identity = dumps(payload)
+        entry.gzip = None
+        entry.br = None
+        if len(entry.identity) >= MIN_COMPRESS_BYTES:
+            # Compression runs once per content change, off the event loop
+            entry.gzip, entry.br = await asyncio.to_thread(self._compress, entry.identity)
+        self.encodes += 1
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _compress(self, body: bytes):
+        compressed_gzip = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        compressed_br = brotli.compress(body, quality=self.brotli_quality) if brotli is not None else None
+        return compressed_gzip, compressed_br
+
+    def respond(self, request: Request, entry: EncodedBody) -> Response:
+        """Answer with 304 when the client's copy is current, else the best encoding it accepts"""
+        headers = {
+            'ETag': entry.etag,
+            'Last-Modified': format_datetime(entry.last_modified, usegmt=True),
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        if self._is_not_modified(request, entry):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        accepted = _accepted_encodings(request.headers.get('accept-encoding', ''))
+        body = entry.identity
+        if entry.br is not None and accepted.get('br', 0) > 0:
+            body = entry.br
+            headers['Content-Encoding'] = 'br'
+        elif entry.gzip is not None and accepted.get('gzip', 0) > 0:
+            body = entry.gzip
+            headers['Content-Encoding'] = 'gzip'
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    @staticmethod
+    def _is_not_modified(request: Request, entry: EncodedBody) -> bool:
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            # Weak comparison, as required for If-None-Match; it takes precedence over If-Modified-Since
+            opaque = entry.etag[2:]
+            for tag in if_none_match.split(','):
+                tag = tag.strip()
+                if tag == '*' or tag.removeprefix('W/') == opaque:
+                    return True
+            return False
+
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return entry.last_modified <= since
+        return False
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'maxEntries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'encodes': self.encodes,
+            'notModified': self.not_modified,
+            'brotli': brotli is not None,
+            'hitRatio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,193 @@
+import math
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from html import escape
+from typing import Dict, Iterable, List
+from services.html_processor import process_html
+
+_TOKEN = re.compile(r'\w+')
+
+# Title words count as this many body occurrences
+TITLE_WEIGHT = 3
+# A prefix expansion scores this fraction of an exact term match
+PREFIX_WEIGHT = 0.7
+PREFIX_MIN_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50
+SNIPPET_LENGTH = 200
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class _IndexedPost:
+    __slots__ = ('updated', 'length', 'terms', 'text', 'summary')
+
+
+class SearchIndex:
+    """
+    In-memory BM25 inverted index over blog posts.
+
+    Posts are indexed from their title and the plain text of their content.
+    `upsert` skips posts whose `updated` stamp has not changed, so feeding it
+    every fetched page only reindexes edited posts. Query terms also match
+    vocabulary words they prefix, found by bisecting the sorted vocabulary.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._vocabulary: List[str] = []
+        self._posts: Dict[str, _IndexedPost] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def upsert(self, post: Dict) -> bool:
+        """Index a processed post with content, returning whether anything changed"""
+        post_id = post.get('id')
+        content = post.get('content')
+        if not post_id or content is None:
+            return False
+        updated = post.get('updated') or post.get('published') or ''
+        existing = self._posts.get(post_id)
+        if existing is not None and existing.updated == updated:
+            return False
+        if existing is not None:
+            self.remove(post_id)
+
+        text = process_html(content).plain_text
+        counts: Dict[str, int] = defaultdict(int)
+        for term in tokenize(text):
+            counts[term] += 1
+        for term in tokenize(post.get('title', '')):
+            counts[term] += TITLE_WEIGHT
+
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._vocabulary, term)
+            postings[post_id] = count
+
+        indexed = _IndexedPost()
+        indexed.updated = updated
+        indexed.length = sum(counts.values())
+        indexed.terms = tuple(counts)
+        indexed.text = text
+        indexed.summary = {key: value for key, value in post.items() if key != 'content'}
+        self._posts[post_id] = indexed
+        self._total_length += indexed.length
+        return True
+
+    def remove(self, post_id: str) -> None:
+        indexed = self._posts.pop(post_id, None)
+        if indexed is None:
+            return
+        self._total_length -= indexed.length
+        for term in indexed.terms:
+            postings = self._postings[term]
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def retain(self, post_ids: Iterable[str]) -> int:
+        """Drop every post not in post_ids, returning how many were removed"""
+        keep = set(post_ids)
+        stale = [post_id for post_id in self._posts if post_id not in keep]
+        for post_id in stale:
+            self.remove(post_id)
+        return len(stale)
+
+    def _expand(self, term: str) -> List[tuple]:
+        """Return (vocabulary term, weight) pairs a query term matches"""
+        matches = [(term, 1.0)] if term in self._postings else []
+        if len(term) >= PREFIX_MIN_LENGTH:
+            start = bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    matches.append((candidate, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True) -> Dict:
+        """Rank posts for a query, returning the top `limit` with highlighted snippets"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._posts:
+            return {'results': [], 'totalResults': 0}
+
+        post_count = len(self._posts)
+        average_length = self._total_length / post_count
+        scores: Dict[str, float] = defaultdict(float)
+        for term in terms:
+            expansions = self._expand(term) if prefix else ([(term, 1.0)] if term in self._postings else [])
+            # Each query term counts once per post, through its best matching word
+            best: Dict[str, float] = {}
+            for word, weight in expansions:
+                postings = self._postings[word]
+                idf = math.log(1 + (post_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id, frequency in postings.items():
+                    length = self._posts[post_id].length
+                    score = weight * idf * frequency * (self.k1 + 1) / (
+                        frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                    )
+                    if score > best.get(post_id, 0.0):
+                        best[post_id] = score
+            for post_id, score in best.items():
+                scores[post_id] += score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        highlight = self._highlighter(terms, prefix)
+        results = []
+        for post_id, score in ranked[:limit]:
+            indexed = self._posts[post_id]
+            result = dict(indexed.summary)
+            result['score'] = round(score, 4)
+            result['snippet'] = self._snippet(indexed.text, highlight)
+            results.append(result)
+        return {'results': results, 'totalResults': len(ranked)}
+
+    @staticmethod
+    def _highlighter(terms: List[str], prefix: bool) -> re.Pattern:
+        alternatives = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        suffix = r'\w*' if prefix else r'\b'
+        return re.compile(rf'\b(?:{alternatives}){suffix}', re.IGNORECASE)
+
+    @staticmethod
+    def _snippet(text: str, highlight: re.Pattern) -> str:
+        """Cut a window around the first match and wrap matches in <mark>, escaping the rest"""
+        first = highlight.search(text)
+        start = 0
+        if first is not None and first.start() > SNIPPET_LENGTH // 4:
+            # Lead into the match with some context, starting on a word boundary
+            start = first.start() - SNIPPET_LENGTH // 4
+            space = text.find(' ', start, first.start())
+            if space != -1:
+                start = space + 1
+        end = min(len(text), start + SNIPPET_LENGTH)
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            if space > start:
+                end = space
+        window = text[start:end]
+
+        parts = []
+        position = 0
+        for match in highlight.finditer(window):
+            parts.append(escape(window[position:match.start()]))
+            parts.append(f'<mark>{escape(match.group(0))}</mark>')
+            position = match.end()
+        parts.append(escape(window[position:]))
+        return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(text) else '')
+
+    def stats(self) -> Dict:
+        return {
+            'posts': len(self._posts),
+            'terms': len(self._postings),
+            'averageLength': round(self._total_length / len(self._posts), 1) if self._posts else 0
+        }
@@ -0,0 +1,28 @@
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes with orjson, which handles datetimes natively and ObjectIds as strings"""
+    return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    App-wide JSON response rendered by orjson.
+
+    Routes that build their payload themselves return this directly with a
+    typed `response_model`, so the schema is documented without FastAPI
+    validating and re-encoding the payload a second time.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
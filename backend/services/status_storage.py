@@ -0,0 +1,58 @@
+import logging
+import os
+from typing import List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLLECTION = 'status_checks'
+
+# Heartbeats older than this are expired by MongoDB; 0 keeps them forever
+RETENTION_SECONDS = int(float(os.environ.get('STATUS_CHECK_RETENTION_DAYS', 30)) * 86400)
+
+
+def status_check_indexes(timeseries: bool) -> List[IndexModel]:
+    """Indexes for status_checks, which differ between time-series and plain collections"""
+    indexes = [IndexModel([('timestamp', ASCENDING), ('_id', ASCENDING)], name='app_timestamp_id')]
+    if timeseries:
+        # Time-series collections expire through a collection option rather than a TTL index
+        indexes.append(IndexModel([('client_name', ASCENDING), ('timestamp', ASCENDING)], name='app_client_timestamp'))
+    elif RETENTION_SECONDS > 0:
+        indexes.append(IndexModel([('timestamp', ASCENDING)], name='app_timestamp_ttl', expireAfterSeconds=RETENTION_SECONDS))
+    return indexes
+
+
+async def ensure_status_collection(db: AsyncIOMotorDatabase) -> bool:
+    """
+    Make sure status_checks exists with the configured retention.
+
+    With STATUS_CHECKS_TIMESERIES enabled and no collection yet, it is created
+    as a time-series collection keyed on timestamp and bucketed by client_name
+    (MongoDB 6.0+). An existing plain collection is kept and bounded by a TTL
+    index instead, since converting it would mean copying every row.
+    Returns whether the collection is time-series.
+    """
+    cursor = await db.list_collections(filter={'name': STATUS_COLLECTION})
+    infos = await cursor.to_list(length=1)
+
+    if not infos:
+        if os.environ.get('STATUS_CHECKS_TIMESERIES', 'false').lower() != 'true':
+            return False
+        options = {'timeseries': {'timeField': 'timestamp', 'metaField': 'client_name', 'granularity': 'seconds'}}
+        if RETENTION_SECONDS > 0:
+            options['expireAfterSeconds'] = RETENTION_SECONDS
+        await db.create_collection(STATUS_COLLECTION, **options)
+        logger.info(f"Created time-series collection {STATUS_COLLECTION}")
+        return True
+
+    info = infos[0]
+    if info.get('type') != 'timeseries':
+        return False
+
+    expire_after = info.get('options', {}).get('expireAfterSeconds')
+    wanted = RETENTION_SECONDS if RETENTION_SECONDS > 0 else 'off'
+    if expire_after != wanted and not (expire_after is None and wanted == 'off'):
+        await db.command({'collMod': STATUS_COLLECTION, 'expireAfterSeconds': wanted})
+        logger.info(f"Set {STATUS_COLLECTION} retention to {wanted}")
+    return True
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { BookOpen, Clock, Calendar, ArrowRight, ExternalLink, RefreshCw, AlertCircle } from 'lucide-react';
-import { blogApi, handleApiError } from '../services/apiService';
+import { blogApi, handleApiError, BLOG_LIST_FIELDS } from '../services/apiService';
 
 const Blog = () => {
   const [blogPosts, setBlogPosts] = useState([]);
@@ -18,7 +18,7 @@ const Blog = () => {
       }
       setError(null);
 
-      const response = await blogApi.getPosts(10);
+      const response = await blogApi.getPosts(10, null, BLOG_LIST_FIELDS);
       
       if (response.status === 'success' && response.data) {
         setBlogPosts(response.data.posts || []);
@@ -36,12 +36,25 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Post fields shown by the blog list; leaving out content lets the backend skip post bodies
+export const BLOG_LIST_FIELDS = 'id,title,excerpt,publishDate,readTime,category,url';
+
 // Blog API functions
 export const blogApi = {
-  // Fetch all blog posts
-  async getPosts(maxResults = 10) {
+  // Fetch a page of blog posts, pass the previous page's nextCursor to continue
+  async getPosts(maxResults = 10, cursor = null, fields = null, label = null) {
     try {
-      const response = await apiClient.get(`/blog/posts?max_results=${maxResults}`);
+      let url = `/blog/posts?max_results=${maxResults}`;
+      if (cursor) {
+        url += `&cursor=${encodeURIComponent(cursor)}`;
+      }
+      if (fields) {
+        url += `&fields=${encodeURIComponent(fields)}`;
+      }
+      if (label) {
+        url += `&label=${encodeURIComponent(label)}`;
+      }
+      const response = await apiClient.get(url);
       return response.data;
     } catch (error) {
       console.error('Error fetching blog posts:', error);
@@ -60,6 +73,28 @@ export const blogApi = {
     }
   },
 
+  // Every post label with its post count
+  async getCategories() {
+    try {
+      const response = await apiClient.get('/blog/categories');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching blog categories:', error);
+      throw error;
+    }
+  },
+
+  // Full-text search over blog posts; snippets mark matches with <mark>
+  async search(query, limit = 10) {
+    try {
+      const response = await apiClient.get(`/blog/search?q=${encodeURIComponent(query)}&limit=${limit}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error searching blog posts:', error);
+      throw error;
+    }
+  },
+
   // Health check for blog service
   async healthCheck() {
     try {
@@ -86,12 +121,15 @@ export const contactApi = {
   },
 
   // Get contact messages (admin function)
-  async getMessages(skip = 0, limit = 50, status = null) {
+  async getMessages(skip = 0, limit = 50, status = null, cursor = null) {
     try {
       let url = `/contact/messages?skip=${skip}&limit=${limit}`;
       if (status) {
         url += `&status=${status}`;
       }
+      if (cursor) {
+        url += `&cursor=${encodeURIComponent(cursor)}`;
+      }
       const response = await apiClient.get(url);
       return response.data;
     } catch (error) {
@@ -111,6 +149,22 @@ export const contactApi = {
       console.error('Error updating message status:', error);
       throw error;
     }
+  },
+
+  // Update the status of many messages at once (admin function)
+  async bulkUpdateMessageStatus(newStatus, { ids = null, status = null, submittedBefore = null } = {}) {
+    try {
+      const response = await apiClient.put('/contact/messages/status', {
+        newStatus,
+        ids,
+        status,
+        submittedBefore
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error bulk updating message status:', error);
+      throw error;
+    }
   }
 };
 
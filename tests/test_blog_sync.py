@@ -0,0 +1,55 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from services.blog_sync import BlogSyncWorker
+
+
+class FakeBlogService:
+    search_index = None
+    label_index = None
+
+
+def make_post(post_id: str) -> dict:
+    return {'id': post_id, 'title': f'Post {post_id}', 'published': '2024-01-01T00:00:00Z', 'updated': '2024-01-01T00:00:00Z'}
+
+
+def test_writes_are_seen_by_other_workers(monkeypatch):
+    monkeypatch.setenv('BLOG_MIRROR_VERSION_TTL_SECONDS', '0')
+
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        syncing = BlogSyncWorker(db, FakeBlogService())
+        reading = BlogSyncWorker(db, FakeBlogService())
+        assert await reading.current_version() == 0
+
+        await syncing._upsert([make_post('1'), make_post('2')])
+        first = await reading.current_version()
+        assert first == syncing.version > 0
+
+        await syncing._upsert([make_post('1')])
+        assert await reading.current_version() > first
+
+        # Nothing written, nothing bumped
+        await syncing._upsert([])
+        assert await reading.current_version() == syncing.version
+
+    asyncio.run(scenario())
+
+
+def test_version_is_reread_only_after_the_ttl(monkeypatch):
+    monkeypatch.setenv('BLOG_MIRROR_VERSION_TTL_SECONDS', '60')
+
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        syncing = BlogSyncWorker(db, FakeBlogService())
+        reading = BlogSyncWorker(db, FakeBlogService())
+        assert await reading.current_version() == 0
+
+        await syncing._upsert([make_post('1')])
+        assert await reading.current_version() == 0
+
+        reading.version_ttl = 0
+        assert await reading.current_version() == syncing.version
+
+    asyncio.run(scenario())
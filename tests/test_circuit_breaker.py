@@ -0,0 +1,59 @@
+from services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure('HTTP 503')
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record_failure('HTTP 503')
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+    assert breaker.stats()['lastFailure'] == 'HTTP 503'
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+    breaker.record_failure('timeout')
+    breaker.record_success()
+    breaker.record_failure('timeout')
+    assert breaker.state == CLOSED
+
+
+def test_half_open_limits_probes_and_closes_on_success():
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0, half_open_probes=1)
+    breaker.record_failure('timeout')
+    assert breaker.state == OPEN
+
+    # The reset timeout has passed, so the next caller becomes the probe
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure('timeout')
+    assert breaker.allow()
+    breaker.record_failure('HTTP 500')
+    assert breaker.state == OPEN
+    assert breaker.stats()['opened'] == 2
+
+
+def test_release_frees_an_abandoned_probe():
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure('timeout')
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
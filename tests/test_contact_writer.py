@@ -0,0 +1,224 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId, json_util
+from mongomock_motor import AsyncMongoMockClient
+
+from services import contact_writer
+from services.contact_writer import ContactWriteBehind, LOCK_NAME
+from services.message_counts import increment_status_count
+
+
+@pytest.fixture(autouse=True)
+def writer_settings(monkeypatch):
+    # Large batches and a long interval, so nothing is flushed until a test asks for it
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_BATCH_SIZE', '100')
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_FLUSH_INTERVAL', '60')
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_ENQUEUE_TIMEOUT', '0.1')
+
+
+def make_message(number: int) -> dict:
+    return {
+        '_id': ObjectId(),
+        'name': f'Sender {number}',
+        'email': f'sender{number}@example.com',
+        'message': f'Message {number}',
+        'submittedAt': datetime(2024, 1, 1),
+        'status': 'new'
+    }
+
+
+def journaled(writer: ContactWriteBehind) -> list:
+    lines = []
+    for path in sorted(writer.journal_dir.glob('segment-*.jsonl')):
+        lines.extend(json_util.loads(line) for line in path.read_text().splitlines() if line)
+    return lines
+
+
+def crash(writer: ContactWriteBehind) -> None:
+    """Stop a writer the way a killed process would: no flush, journal left behind, lock released"""
+    writer._task.cancel()
+    writer._segment_file.close()
+    os.close(writer._lock_fd)
+
+
+async def stored_count(db) -> int:
+    counts = await db.contact_message_counts.find_one({'_id': 'new'})
+    return counts['count'] if counts else 0
+
+
+def test_submit_journals_and_stop_flushes(tmp_path):
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        writer = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await writer.start()
+        messages = [make_message(number) for number in range(3)]
+        for message in messages:
+            await writer.submit(message)
+
+        assert [entry['_id'] for entry in journaled(writer)] == [message['_id'] for message in messages]
+        assert await db.contact_messages.count_documents({}) == 0
+
+        await writer.stop()
+        assert await db.contact_messages.count_documents({}) == 3
+        assert await stored_count(db) == 3
+        # A clean stop leaves no journal behind
+        assert not writer.journal_dir.exists()
+
+    asyncio.run(scenario())
+
+
+def test_flush_releases_segments(tmp_path, monkeypatch):
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_JOURNAL_MAX_BYTES', '1')
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_BATCH_SIZE', '4')
+
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        writer = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await writer.start()
+        for number in range(4):
+            await writer.submit(make_message(number))
+        # Every message rolled over into a segment of its own
+        assert len(list(writer.journal_dir.glob('segment-*.jsonl'))) == 4
+
+        for _ in range(100):
+            if writer.flushed == 4:
+                break
+            await asyncio.sleep(0.01)
+        assert writer.flushed == 4
+
+        segments = list(writer.journal_dir.glob('segment-*.jsonl'))
+        assert segments == [writer._segment_path(writer._segment)]
+        assert segments[0].stat().st_size == 0
+        assert writer.stats()['journalSegments'] == 1
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_replay_skips_messages_already_stored(tmp_path):
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        stored, pending = make_message(1), make_message(2)
+        await db.contact_messages.insert_one(dict(stored))
+
+        # The journal of a writer that crashed after part of a batch was inserted
+        dead = tmp_path / 'host-1-deadbeef'
+        dead.mkdir()
+        (dead / LOCK_NAME).touch()
+        (dead / 'segment-00000000.jsonl').write_text(json_util.dumps(stored) + '\n' + json_util.dumps(pending) + '\n')
+
+        writer = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await writer.start()
+        assert await db.contact_messages.count_documents({}) == 2
+        # Only the message that was actually inserted by the replay is counted
+        assert await stored_count(db) == 1
+        assert not dead.exists()
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_writers_sharing_a_root_keep_their_own_journals(tmp_path):
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        first = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        second = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await first.start()
+        await second.start()
+        assert first.journal_dir != second.journal_dir
+
+        for number in range(3):
+            await first.submit(make_message(number))
+        await second.submit(make_message(3))
+        await second.stop()
+
+        # Flushing the second writer leaves the first one's unflushed messages alone
+        assert await db.contact_messages.count_documents({}) == 1
+        assert len(journaled(first)) == 3
+
+        # A writer starting next to a live one does not replay its journal
+        third = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await third.start()
+        assert await db.contact_messages.count_documents({}) == 1
+        assert len(journaled(first)) == 3
+
+        # Once the first writer is gone, the next start replays what it left
+        crash(first)
+        fourth = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await fourth.start()
+        assert await db.contact_messages.count_documents({}) == 4
+        assert not first.journal_dir.exists()
+
+        await third.stop()
+        await fourth.stop()
+        assert list(tmp_path.iterdir()) == [tmp_path / LOCK_NAME]
+
+    asyncio.run(scenario())
+
+
+def test_failed_count_update_does_not_stop_flushing(tmp_path, monkeypatch):
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_BATCH_SIZE', '1')
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_MAX_QUEUE', '1')
+    failures = []
+
+    async def failing_once(db, status, delta=1):
+        if not failures:
+            failures.append(status)
+            raise RuntimeError('counter update failed')
+        await increment_status_count(db, status, delta)
+
+    monkeypatch.setattr(contact_writer, 'increment_status_count', failing_once)
+
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        writer = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        await writer.start()
+        # With a single slot, each submission waits for the previous message to be stored
+        for number in range(3):
+            await writer.submit(make_message(number))
+        for _ in range(100):
+            if writer.flushed == 3:
+                break
+            await asyncio.sleep(0.01)
+
+        assert failures == ['new']
+        assert await db.contact_messages.count_documents({}) == 3
+        assert await stored_count(db) == 2
+        assert not writer._task.done()
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_flusher_survives_unexpected_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv('CONTACT_WRITE_BEHIND_FLUSH_INTERVAL', '0')
+
+    async def scenario():
+        db = AsyncMongoMockClient()['test']
+        writer = ContactWriteBehind(db, journal_dir=str(tmp_path))
+        flush = writer._flush
+        calls = []
+
+        async def failing_once(batch):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise RuntimeError('unexpected')
+            return await flush(batch)
+
+        writer._flush = failing_once
+        await writer.start()
+        await writer.submit(make_message(1))
+        for _ in range(300):
+            if writer.flushed == 1:
+                break
+            await asyncio.sleep(0.01)
+
+        # The interrupted batch is retried rather than dropped
+        assert writer.flushed == 1
+        assert await db.contact_messages.count_documents({}) == 1
+        await writer.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes.blog_routes import router as blog_router, get_blog_mirror, get_blog_service
+from services.cursors import encode_cursor, decode_cursor
+
+
+def test_round_trip():
+    position = {'k': ['2024-01-01T00:00:00', '123'], 's': 'new'}
+    cursor = encode_cursor(position)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == position
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', encode_cursor([1, 2]), 'bm90IGpzb24', ''])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+class FakeMirror:
+    ready = True
+
+    async def current_version(self):
+        return 1
+
+    async def list_posts(self, *args, **kwargs):
+        raise AssertionError('a malformed cursor must not reach the mirror')
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(blog_router, prefix='/api')
+    app.dependency_overrides[get_blog_mirror] = lambda: FakeMirror()
+    app.dependency_overrides[get_blog_service] = lambda: None
+    return TestClient(app)
+
+
+@pytest.mark.parametrize('position', [
+    {'k': 'x'},
+    {'k': [1]},
+    {'k': ['not a date', '123']},
+    {'k': ['2024-01-01T00:00:00', 123]},
+    {'k': {'a': 1, 'b': 2}},
+    {'pt': 5},
+])
+def test_blog_posts_rejects_malformed_positions(client, position):
+    response = client.get('/api/blog/posts', params={'cursor': encode_cursor(position)})
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Invalid cursor'
@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import cache as cache_module
+from services.cache import DerivedFieldCache, FeedCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache's clock moves; the event loop keeps real time
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def loader_returning(value, calls: list, delay: float = 0):
+    async def load():
+        calls.append(value)
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+    return load
+
+
+def test_concurrent_misses_share_one_load(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60)
+        calls = []
+        results = await asyncio.gather(*(cache.get_or_load('feed', loader_returning('v1', calls, delay=0.01)) for _ in range(5)))
+        assert results == ['v1'] * 5
+        assert calls == ['v1']
+        assert cache.stats()['misses'] == 5
+        assert cache.stats()['inflight'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, stale_ttl=600)
+        calls = []
+        await cache.get_or_load('feed', loader_returning('v1', calls))
+
+        clock.now += 120
+        # Both callers get the stale value at once, and only one refresh starts
+        assert await cache.get_or_load('feed', loader_returning('v2', calls, delay=0.01)) == 'v1'
+        assert await cache.get_or_load('feed', loader_returning('v2', calls, delay=0.01)) == 'v1'
+        assert cache.stats()['staleHits'] == 2
+
+        await asyncio.sleep(0.05)
+        assert calls == ['v1', 'v2']
+        assert await cache.get_or_load('feed', loader_returning('v3', calls)) == 'v2'
+        assert cache.stats()['hits'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_entry_past_the_stale_window_is_reloaded(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, stale_ttl=600)
+        calls = []
+        await cache.get_or_load('feed', loader_returning('v1', calls))
+
+        clock.now += 1000
+        assert await cache.get_or_load('feed', loader_returning('v2', calls)) == 'v2'
+        assert cache.stats()['misses'] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_serves_the_last_good_value(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60)
+        await cache.get_or_load('feed', loader_returning('v1', []))
+
+        async def failing():
+            raise RuntimeError('upstream down')
+
+        clock.now += 120
+        assert await cache.get_or_load('feed', failing) == 'v1'
+        assert cache.stats()['loadErrors'] == 1
+
+    asyncio.run(scenario())
+
+
+def fill(cache: FeedCache, *keys) -> None:
+    for key in keys:
+        cache.put(key, key)
+
+
+def test_lru_evicts_the_least_recently_used(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, max_entries=2, policy='lru')
+        fill(cache, 'a', 'b')
+        await cache.get_or_load('a', loader_returning('unused', []))
+        fill(cache, 'c')
+        assert cache.peek('a') == 'a'
+        assert cache.peek('b') is None
+
+    asyncio.run(scenario())
+
+
+def test_fifo_evicts_the_oldest_insert(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, max_entries=2, policy='fifo')
+        fill(cache, 'a', 'b')
+        await cache.get_or_load('a', loader_returning('unused', []))
+        fill(cache, 'c')
+        assert cache.peek('a') is None
+        assert cache.peek('b') == 'b'
+
+    asyncio.run(scenario())
+
+
+def test_lfu_evicts_the_least_hit_and_spares_the_new_entry(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, max_entries=2, policy='lfu')
+        fill(cache, 'a', 'b')
+        for _ in range(3):
+            await cache.get_or_load('a', loader_returning('unused', []))
+        await cache.get_or_load('b', loader_returning('unused', []))
+        fill(cache, 'c')
+        assert cache.peek('a') == 'a'
+        assert cache.peek('b') is None
+        assert cache.peek('c') == 'c'
+
+    asyncio.run(scenario())
+
+
+def test_lfu_keeps_hits_across_refreshes(clock):
+    async def scenario():
+        cache = FeedCache(ttl=60, stale_ttl=600, max_entries=2, policy='lfu')
+        calls = []
+        await cache.get_or_load('popular', loader_returning('v1', calls))
+        for _ in range(3):
+            await cache.get_or_load('popular', loader_returning('unused', calls))
+        fill(cache, 'other')
+        await cache.get_or_load('other', loader_returning('unused', calls))
+
+        # A background refresh replaces the popular entry
+        clock.now += 120
+        await cache.get_or_load('popular', loader_returning('v2', calls))
+        await asyncio.sleep(0)
+        assert cache.peek('popular') == 'v2'
+
+        fill(cache, 'new')
+        assert cache.peek('popular') == 'v2'
+        assert cache.peek('other') is None
+
+    asyncio.run(scenario())
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        FeedCache(ttl=60, policy='random')
+
+
+def test_derived_fields_survive_a_save_and_load(tmp_path):
+    path = tmp_path / 'derived.json'
+    cache = DerivedFieldCache(path=str(path))
+    cache.put('key', {'excerpt': 'text'})
+    cache.save()
+
+    restored = DerivedFieldCache(path=str(path))
+    restored.load()
+    assert restored.get('key') == {'excerpt': 'text'}
+    # Nothing but the saved file is left in the directory
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,89 @@
+import asyncio
+import gzip
+from datetime import timedelta
+from email.utils import format_datetime
+
+from starlette.requests import Request
+
+from services.response_cache import EncodedResponseCache
+
+PAYLOAD = {'status': 'success', 'data': {'posts': [{'id': str(number), 'title': 'x' * 100} for number in range(20)]}}
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'headers': [(name.replace('_', '-').lower().encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+def store(cache: EncodedResponseCache, payload=PAYLOAD, version=1, fingerprint=None):
+    return asyncio.run(cache.put('posts', version, payload, fingerprint=fingerprint))
+
+
+def test_matching_etag_is_not_modified():
+    cache = EncodedResponseCache()
+    entry = store(cache)
+    assert entry.etag.startswith('W/"')
+
+    response = cache.respond(make_request(if_none_match=entry.etag), entry)
+    assert response.status_code == 304
+    assert response.headers['etag'] == entry.etag
+    assert cache.stats()['notModified'] == 1
+
+
+def test_etag_comparison_is_weak_and_accepts_lists():
+    cache = EncodedResponseCache()
+    entry = store(cache)
+    strong = entry.etag[2:]
+
+    assert cache.respond(make_request(if_none_match=strong), entry).status_code == 304
+    assert cache.respond(make_request(if_none_match=f'"other", {entry.etag}'), entry).status_code == 304
+    assert cache.respond(make_request(if_none_match='*'), entry).status_code == 304
+    assert cache.respond(make_request(if_none_match='W/"other"'), entry).status_code == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    cache = EncodedResponseCache()
+    entry = store(cache)
+    later = format_datetime(entry.last_modified + timedelta(hours=1), usegmt=True)
+
+    response = cache.respond(make_request(if_none_match='W/"other"', if_modified_since=later), entry)
+    assert response.status_code == 200
+
+
+def test_if_modified_since():
+    cache = EncodedResponseCache()
+    entry = store(cache)
+    current = format_datetime(entry.last_modified, usegmt=True)
+    earlier = format_datetime(entry.last_modified - timedelta(hours=1), usegmt=True)
+
+    assert cache.respond(make_request(if_modified_since=current), entry).status_code == 304
+    assert cache.respond(make_request(if_modified_since=earlier), entry).status_code == 200
+    assert cache.respond(make_request(if_modified_since='not a date'), entry).status_code == 200
+
+
+def test_unchanged_fingerprint_keeps_the_etag():
+    cache = EncodedResponseCache()
+    first = store(cache, {**PAYLOAD, 'fetched': 1}, version=1, fingerprint=PAYLOAD)
+    second = store(cache, {**PAYLOAD, 'fetched': 2}, version=2, fingerprint=PAYLOAD)
+    assert second is first
+    assert cache.get('posts', 2) is first
+
+    changed = store(cache, {'status': 'success', 'data': {'posts': []}}, version=3)
+    assert changed.etag != first.etag
+
+
+def test_serves_gzip_when_accepted():
+    cache = EncodedResponseCache()
+    entry = store(cache)
+
+    response = cache.respond(make_request(accept_encoding='br;q=0, gzip'), entry)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(response.body) == entry.identity
+
+    plain = cache.respond(make_request(accept_encoding='gzip;q=0'), entry)
+    assert 'content-encoding' not in plain.headers
+    assert plain.body == entry.identity